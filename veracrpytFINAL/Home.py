@@ -3,16 +3,15 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from openai import OpenAI
 import numpy as np
 from datetime import datetime
 from utils.database import Database
+from utils.data_loader import load_numeric_dataset, SUPPORTED_EXTENSIONS
+from utils.analytics import build_analytics_bundle
+from utils.charts import box_trace, scatter_traces, series_traces
+from utils.ai_analysis import AnalysisJobs, get_backend
+from utils.prompt_builder import build_analysis_prompts
 from pathlib import Path
-import os
-
-# Initialize OpenAI client
-from openai import OpenAI
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 # Set page configuration
 st.set_page_config(
@@ -126,20 +125,10 @@ def get_css(theme_colors):
     </style>
     """
 
-def analyze_with_chatgpt(synthetic_data_description):
-    """Send synthetic data analysis request to ChatGPT"""
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a data analysis expert. Analyze the following synthetic dataset and provide insights."},
-                {"role": "user", "content": f"Analyze this synthetic dataset: {synthetic_data_description}"}
-            ]
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error in ChatGPT analysis: {str(e)}")
-        return None
+@st.cache_resource
+def get_analysis_jobs():
+    """Background AI analysis runner shared by all sessions of this server"""
+    return AnalysisJobs(get_backend())
 
 def main():
     # Apply theme CSS
@@ -162,31 +151,42 @@ def main():
     with col1:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.subheader("📊 Data Analysis")
-        uploaded_file = st.file_uploader("Upload your CSV file for analysis", type=['csv'])
+        uploaded_file = st.file_uploader(
+            "Upload your CSV, Parquet, Feather or Arrow file for analysis",
+            type=list(SUPPORTED_EXTENSIONS)
+        )
         
         if uploaded_file:
-            # Reset analysis state when new file is uploaded
-            st.session_state.analysis_complete = False
-            st.session_state.analysis_result = None
             try:
-                # Read the CSV
-                df = pd.read_csv(uploaded_file)
-                
-                # Initialize Database instance for synthetic data generation
-                db = Database()
-                
-                # Generate synthetic data and immediately store it
-                synthetic_data = db.generate_base_synthetic_data(df)
-                
-                # Show a one-time preview of original data with warning
-                st.markdown("---")
-                st.warning("⚠️ Original Data Preview - Will be deleted after synthetic generation")
-                st.dataframe(df.head())
+                # Synthesize once per upload; reruns reuse the stored dataset
+                if st.session_state.get('upload_id') != uploaded_file.file_id:
+                    # Reset analysis state when new file is uploaded
+                    st.session_state.analysis_complete = False
+                    st.session_state.analysis_result = None
+                    
+                    # Read only the numeric columns the synthesizer uses
+                    df = load_numeric_dataset(uploaded_file)
+                    
+                    # Initialize Database instance for synthetic data generation
+                    db = Database()
+                    
+                    # Generate synthetic data and immediately store it
+                    synthetic_data = db.generate_base_synthetic_data(df)
+                    st.session_state.synthetic_data = synthetic_data
+                    st.session_state.analytics = build_analytics_bundle(synthetic_data)
+                    st.session_state.upload_id = uploaded_file.file_id
+                    
+                    # Show a one-time preview of original data with warning
+                    st.markdown("---")
+                    st.warning("⚠️ Original Data Preview - Will be deleted after synthetic generation")
+                    st.dataframe(df.head())
+                    
+                    # Clear original dataframe from memory
+                    df = None
                 
-                # Clear original dataframe from memory
-                original_shape = df.shape
-                original_columns = list(df.columns)
-                df = None
+                synthetic_data = st.session_state.synthetic_data
+                analytics = st.session_state.analytics
+                numeric_cols = analytics['numeric_columns']
                 
                 # Show synthetic data and confirmation
                 st.markdown("---")
@@ -207,35 +207,37 @@ def main():
                     st.write("### Distribution Analysis")
                     
                     # Column selector for distribution analysis
-                    numeric_cols = synthetic_data.select_dtypes(include=['float64', 'int64']).columns
                     selected_col = st.selectbox(
                         "Select column for distribution analysis",
                         numeric_cols,
                         key="dist_col"
                     )
                     
-                    # Create distribution plot
+                    # Create distribution plot from the precomputed bins
+                    hist = analytics['histograms'][selected_col]
                     fig_dist = go.Figure()
-                    fig_dist.add_trace(go.Histogram(
-                        x=synthetic_data[selected_col],
+                    fig_dist.add_trace(go.Bar(
+                        x=(hist['edges'][:-1] + hist['edges'][1:]) / 2,
+                        y=hist['counts'],
+                        width=np.diff(hist['edges']),
                         name='Synthetic Data',
-                        opacity=0.7,
-                        nbinsx=30
+                        opacity=0.7
                     ))
                     fig_dist.update_layout(
                         title=f"Distribution of {selected_col} (Synthetic Data)",
                         xaxis_title=selected_col,
                         yaxis_title="Count",
-                        template='plotly_white'
+                        template='plotly_white',
+                        bargap=0
                     )
                     st.plotly_chart(fig_dist, use_container_width=True)
                     
                     # Box plot
                     fig_box = go.Figure()
-                    fig_box.add_trace(go.Box(
-                        y=synthetic_data[selected_col],
-                        name='Synthetic Data',
-                        boxpoints='outliers'
+                    fig_box.add_trace(box_trace(
+                        synthetic_data[selected_col],
+                        analytics['describe'][selected_col],
+                        'Synthetic Data'
                     ))
                     fig_box.update_layout(
                         title=f"Box Plot of {selected_col} (Synthetic Data)",
@@ -246,14 +248,13 @@ def main():
                     
                     # Display summary statistics
                     st.write("### 📊 Summary Statistics (Synthetic Data)")
-                    stats_synth = synthetic_data[selected_col].describe()
+                    stats_synth = analytics['describe'][selected_col]
                     st.dataframe(stats_synth, use_container_width=True)
                 
                 with viz_tabs[1]:
                     st.write("### Correlation Analysis (Synthetic Data)")
                     
-                    # Create correlation matrix
-                    corr_synth = synthetic_data.select_dtypes(include=['float64', 'int64']).corr()
+                    corr_synth = analytics['correlation_matrix']
                     
                     fig_corr = px.imshow(
                         corr_synth,
@@ -275,15 +276,9 @@ def main():
                     col_y = st.selectbox("Select Y-axis column", numeric_cols, key="scatter_y")
                     
                     # Create scatter plot with only synthetic data
-                    fig_scatter = go.Figure()
-                    
-                    fig_scatter.add_trace(go.Scatter(
-                        x=synthetic_data[col_x],
-                        y=synthetic_data[col_y],
-                        mode='markers',
-                        name='Synthetic Data',
-                        marker=dict(size=8, opacity=0.6)
-                    ))
+                    fig_scatter = go.Figure(
+                        scatter_traces(synthetic_data[col_x], synthetic_data[col_y], 'Synthetic Data')
+                    )
                     
                     fig_scatter.update_layout(
                         title=f"Scatter Plot: {col_x} vs {col_y}",
@@ -297,25 +292,12 @@ def main():
                     
                     # Add trend line option
                     if st.checkbox("Show Trend Line"):
-                        fig_trend = go.Figure()
-                        
                         # Synthetic data with trend line
-                        z_synth = np.polyfit(synthetic_data[col_x], synthetic_data[col_y], 1)
-                        p_synth = np.poly1d(z_synth)
-                        
-                        fig_trend.add_trace(go.Scatter(
-                            x=synthetic_data[col_x],
-                            y=synthetic_data[col_y],
-                            mode='markers',
-                            name='Synthetic Data',
-                            marker=dict(size=8, opacity=0.6)
-                        ))
-                        
-                        fig_trend.add_trace(go.Scatter(
-                            x=synthetic_data[col_x],
-                            y=p_synth(synthetic_data[col_x]),
-                            name='Trend Line',
-                            line=dict(color='blue', dash='dash')
+                        fig_trend = go.Figure(scatter_traces(
+                            synthetic_data[col_x],
+                            synthetic_data[col_y],
+                            'Synthetic Data',
+                            trend=True
                         ))
                         
                         fig_trend.update_layout(
@@ -335,7 +317,7 @@ def main():
                     selected_cols = st.multiselect(
                         "Select columns for custom analysis",
                         numeric_cols,
-                        default=list(numeric_cols)[:3] if len(numeric_cols) >= 3 else list(numeric_cols)
+                        default=numeric_cols[:3]
                     )
                     
                     if selected_cols:
@@ -345,41 +327,8 @@ def main():
                             ["Line Plot", "Bar Plot", "Area Plot", "Violin Plot"]
                         )
                         
-                        if plot_type == "Line Plot":
-                            fig_custom = go.Figure()
-                            for col in selected_cols:
-                                fig_custom.add_trace(go.Scatter(
-                                    y=synthetic_data[col],
-                                    name=f'{col}',
-                                    mode='lines'
-                                ))
-                        
-                        elif plot_type == "Bar Plot":
-                            fig_custom = go.Figure()
-                            for col in selected_cols:
-                                fig_custom.add_trace(go.Bar(
-                                    name=f'{col}',
-                                    y=synthetic_data[col],
-                                    x=synthetic_data.index
-                                ))
-                        
-                        elif plot_type == "Area Plot":
-                            fig_custom = go.Figure()
-                            for col in selected_cols:
-                                fig_custom.add_trace(go.Scatter(
-                                    y=synthetic_data[col],
-                                    name=f'{col}',
-                                    fill='tonexty'
-                                ))
-                        
-                        elif plot_type == "Violin Plot":
-                            fig_custom = go.Figure()
-                            for col in selected_cols:
-                                fig_custom.add_trace(go.Violin(
-                                    y=synthetic_data[col],
-                                    name=f'{col}',
-                                    side='positive'
-                                ))
+                        # Large datasets are downsampled or aggregated before plotting
+                        fig_custom = go.Figure(series_traces(synthetic_data, selected_cols, plot_type))
                         
                         fig_custom.update_layout(
                             title=f"Custom {plot_type} (Synthetic Data)",
@@ -388,25 +337,23 @@ def main():
                         )
                         st.plotly_chart(fig_custom, use_container_width=True)
                 
-                # Prepare analysis description for GPT using only synthetic data
-                analysis_description = f"""
-                Synthetic Dataset Summary:
-                - Shape: {synthetic_data.shape}
-                - Number of features: {len(synthetic_data.columns)}
-                - Numerical columns: {', '.join(synthetic_data.select_dtypes(include=['number']).columns)}
+                # Prepare a size-bounded analysis description using only synthetic data
+                analysis_prompts = build_analysis_prompts(analytics)
                 
-                Basic Statistics:
-                {synthetic_data.describe().to_string()}
-                
-                Key Correlations:
-                {db.get_significant_correlations(synthetic_data)}
-                """
-                
-                # Get ChatGPT analysis only if not already completed
+                # Submit AI analysis in the background; identical descriptions hit the cache
                 if not st.session_state.analysis_complete:
-                    with st.spinner("Analyzing data with AI..."):
-                        st.session_state.analysis_result = analyze_with_chatgpt(analysis_description)
+                    jobs = get_analysis_jobs()
+                    status, result = jobs.poll(jobs.submit(analysis_prompts))
+                    
+                    if status == 'done':
+                        st.session_state.analysis_result = result
                         st.session_state.analysis_complete = True
+                    elif status == 'pending':
+                        st.write("### AI Analysis Insights")
+                        st.info("🤖 AI analysis is running in the background...")
+                        st.button("🔄 Check Analysis Status")
+                    else:
+                        st.error(f"Error in AI analysis: {result}")
                 
                 # Display analysis if available
                 if st.session_state.analysis_result:
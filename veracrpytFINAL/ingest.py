@@ -0,0 +1,238 @@
+# Survey ingestion service: respondents submit over plain HTTP instead of
+# holding a Streamlit session, and the Streamlit pages stay admin/analytics UIs.
+#
+#   uvicorn ingest:app --workers 4
+#
+#   GET  /surveys/{survey_type}/sessions/{session_id}            validate a session
+#   POST /surveys/{survey_type}/sessions/{session_id}/responses  submit a response (JSON)
+#
+# Clients should send an Idempotency-Key header (any unique string up to 128
+# characters) and reuse it when retrying; a repeated key is acknowledged
+# without storing the response again, including after a journal replay.
+#
+# The service talks to MongoDB through Motor and only starts with
+# STORAGE_BACKEND=mongo; the sqlite and memory stand-ins are for the Streamlit app.
+import asyncio
+from datetime import datetime
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import ConnectionFailure
+from utils.async_database import AsyncDatabase
+from utils.survey_engine import compile_survey
+from utils.surveys import SURVEYS
+from utils.journal import get_journal
+from utils.admission import get_admission, SubmissionRejected
+from utils.health import CircuitBreaker, CircuitOpenError
+from utils.config import (
+    MONGO_URI, MONGO_OPTIONS, STORAGE_BACKEND, INGEST_MAX_POOL_SIZE, INGEST_BATCH_SIZE, INGEST_BATCH_WAIT_MS,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS, HEALTH_CACHE_SECONDS, MAX_RESPONSES_PER_SESSION
+)
+
+
+def create_client():
+    if STORAGE_BACKEND != 'mongo':
+        raise RuntimeError(f"The ingest service needs STORAGE_BACKEND=mongo, not {STORAGE_BACKEND!r}")
+    return AsyncIOMotorClient(MONGO_URI, maxPoolSize=INGEST_MAX_POOL_SIZE, **MONGO_OPTIONS)
+
+
+def create_breaker(client, loop):
+    """Circuit breaker for the Motor client; its probe thread pings through the event loop"""
+    def probe():
+        asyncio.run_coroutine_threadsafe(client.admin.command('ping'), loop).result()
+    return CircuitBreaker(probe, BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS, HEALTH_CACHE_SECONDS)
+
+
+class ResponseBatcher:
+    """Coalesces submissions into one insert_many per session.
+
+    Requests wait on a future until their batch is written, so a response is
+    acknowledged only once it is stored. A batch is flushed when it reaches
+    INGEST_BATCH_SIZE or INGEST_BATCH_WAIT_MS after its first item.
+    """
+
+    def __init__(self, databases):
+        self.databases = databases
+        self.queue = asyncio.Queue()
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        await self.queue.join()
+        self.task.cancel()
+
+    async def submit(self, survey_type, session, response_data, idempotency_key=None):
+        """Wait until the response is written; False if its idempotency key was already stored"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((survey_type, session, response_data, idempotency_key, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + INGEST_BATCH_WAIT_MS / 1000
+        while len(batch) < INGEST_BATCH_SIZE:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch):
+        groups = {}
+        for survey_type, session, response_data, idempotency_key, future in batch:
+            key = (survey_type, session['session_id'])
+            groups.setdefault(key, (session, [], [], []))
+            groups[key][1].append(response_data)
+            groups[key][2].append(idempotency_key)
+            groups[key][3].append(future)
+
+        async def write(survey_type, session, responses, idempotency_keys, futures):
+            try:
+                errors = await self.databases[survey_type].store_responses(session, responses, idempotency_keys)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                return
+            # A partial insert_many failure only fails the rows it names
+            for future, error in zip(futures, errors):
+                if error is None:
+                    future.set_result(True)
+                elif error['code'] == 11000:
+                    # Duplicate idempotency key: already stored by an earlier attempt
+                    future.set_result(False)
+                else:
+                    future.set_exception(Exception(error['errmsg']))
+
+        await asyncio.gather(*(
+            write(survey_type, session, responses, idempotency_keys, futures)
+            for (survey_type, _), (session, responses, idempotency_keys, futures) in groups.items()
+        ))
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+async def validate_session(request):
+    survey_type = request.path_params['survey_type']
+    if survey_type not in SURVEYS:
+        return JSONResponse({'error': 'Unknown survey'}, status_code=404)
+
+    breaker = request.app.state.breaker
+    try:
+        breaker.check()
+        session = await request.app.state.databases[survey_type].get_active_session(request.path_params['session_id'])
+    except ConnectionFailure as e:
+        if not isinstance(e, CircuitOpenError):
+            breaker.record_failure(e)
+        return JSONResponse({'error': 'Database unavailable'}, status_code=503)
+    breaker.record_success()
+    if not session:
+        return JSONResponse({'valid': False}, status_code=404)
+    return JSONResponse({'valid': True, 'expires_at': session['expires_at'].isoformat()})
+
+
+async def submit_response(request):
+    survey_type = request.path_params['survey_type']
+    if survey_type not in SURVEYS:
+        return JSONResponse({'error': 'Unknown survey'}, status_code=404)
+
+    try:
+        response_data = await request.json()
+    except ValueError:
+        return JSONResponse({'error': 'Body must be JSON'}, status_code=400)
+    if not isinstance(response_data, dict):
+        return JSONResponse({'error': 'Body must be a JSON object'}, status_code=400)
+
+    errors = compile_survey(survey_type).validate(response_data)
+    if errors:
+        return JSONResponse({'errors': errors}, status_code=422)
+
+    idempotency_key = request.headers.get('Idempotency-Key') or None
+    if idempotency_key and len(idempotency_key) > 128:
+        return JSONResponse({'error': 'Idempotency-Key must be at most 128 characters'}, status_code=400)
+
+    session_id = request.path_params['session_id']
+    admission = get_admission()
+    # A retry of a submission this worker already took costs nothing, not even a token
+    if idempotency_key and admission.seen(session_id, idempotency_key):
+        return JSONResponse({'stored': True, 'duplicate': True}, status_code=200)
+
+    # Write concurrency is already bounded by the batcher; only the rate limits apply here
+    try:
+        admission.check(survey_type, session_id)
+    except SubmissionRejected as e:
+        return JSONResponse({'error': str(e)}, status_code=429)
+
+    database = request.app.state.databases[survey_type]
+    response_data.setdefault('submitted_at', datetime.utcnow().isoformat())
+    breaker = request.app.state.breaker
+    reserved = False
+    try:
+        # While the breaker is open nothing waits on serverSelectionTimeoutMS
+        breaker.check()
+        session = await database.reserve_response_slot(session_id)
+        if not session:
+            return JSONResponse({'error': 'This survey session has expired or is full'}, status_code=404)
+        reserved = True
+        stored = await request.app.state.batcher.submit(survey_type, session, response_data, idempotency_key)
+    except ConnectionFailure as e:
+        if not isinstance(e, CircuitOpenError):
+            breaker.record_failure(e)
+        # Accepted but not yet stored: the journal replays it once MongoDB is back,
+        # discarding it if the session turns out to be invalid. A slot reserved
+        # before the failure stays counted, so the replay does not count it again.
+        idempotency_key = await asyncio.to_thread(
+            request.app.state.journal.append, survey_type, session_id, response_data, idempotency_key,
+            reserved and bool(MAX_RESPONSES_PER_SESSION)
+        )
+        admission.remember(session_id, idempotency_key)
+        return JSONResponse({'stored': False, 'journaled': True}, status_code=202)
+    except Exception as e:
+        if reserved:
+            await database.release_response_slot(session_id)
+        return JSONResponse({'error': f"Error storing data: {str(e)}"}, status_code=503)
+    breaker.record_success()
+    if idempotency_key:
+        admission.remember(session_id, idempotency_key)
+    if not stored:
+        # Already stored by an earlier attempt; it does not count against the cap twice
+        await database.release_response_slot(session_id)
+        return JSONResponse({'stored': True, 'duplicate': True}, status_code=200)
+    return JSONResponse({'stored': True}, status_code=201)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    client = create_client()
+    app.state.breaker = create_breaker(client, asyncio.get_running_loop())
+    app.state.databases = {survey_type: AsyncDatabase(survey_type, client) for survey_type in SURVEYS}
+    for database in app.state.databases.values():
+        await database.ensure_indexes()
+    app.state.batcher = ResponseBatcher(app.state.databases)
+    app.state.batcher.start()
+    app.state.journal = get_journal()
+    yield
+    await app.state.batcher.stop()
+    client.close()
+
+
+app = Starlette(
+    routes=[
+        Route('/surveys/{survey_type}/sessions/{session_id}', validate_session, methods=['GET']),
+        Route('/surveys/{survey_type}/sessions/{session_id}/responses', submit_response, methods=['POST'])
+    ],
+    lifespan=lifespan
+)
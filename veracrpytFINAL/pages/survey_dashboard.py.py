@@ -1,6 +1,7 @@
 import streamlit as st
 from datetime import datetime
 from utils.database import Database
+from utils.surveys import SURVEYS
 
 # Initialize session state for theme if it doesn't exist
 if 'theme' not in st.session_state:
@@ -218,32 +219,10 @@ except Exception as e:
 st.markdown("<h1>Welcome to VeraCrypt Surveys</h1>", unsafe_allow_html=True)
 st.markdown("<h3>Discover meaningful insights through anonymous surveys</h3>", unsafe_allow_html=True)
 
-# Survey categories
+# Survey categories, from the survey registry
 categories = {
-    "Mental Health & Well-being": {
-        "description": "Gain valuable insights into community mental health trends and support needs through anonymous feedback",
-        "url": "mental_health"
-    },
-    "Academic Integrity & Performance": {
-        "description": "Evaluate academic honesty practices and identify areas for improving educational outcomes",
-        "url": "academic_integrity"
-    },
-    "Socioeconomic Status & Financial Hardship": {
-        "description": "Understand economic challenges and develop targeted support strategies for your community",
-        "url": "socioeconomic_status"
-    },
-    "Diversity, Equality & Inclusion": {
-        "description": "Assess inclusivity initiatives and gather insights to create a more equitable environment",
-        "url": "diversity_equality"
-    },
-    "Sexual Health & Awareness": {
-        "description": "Promote comprehensive sexual health education and awareness through confidential feedback",
-        "url": "sexual_health"
-    },
-    "Substance Use & Risk Behavior": {
-        "description": "Address substance use patterns and develop effective prevention strategies",
-        "url": "substance_use"
-    }
+    survey['category']: {'description': survey['description'], 'url': survey_type}
+    for survey_type, survey in SURVEYS.items()
 }
 
 # Display survey options in two columns using custom grid layout
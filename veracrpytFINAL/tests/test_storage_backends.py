@@ -0,0 +1,161 @@
+# Database flows against the local stand-in backends in utils/storage.py.
+#
+#   cd veracrpytFINAL && python -m pytest tests
+import random
+import secrets
+import sys
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import admission, database
+from utils.catalog import SyntheticCatalog
+from utils.database import Database
+from utils.storage import StorageClient, MemoryStore, SQLiteStore
+from utils.survey_engine import compile_survey
+
+SURVEY_TYPE = 'mental_health'
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def db(request, tmp_path, monkeypatch):
+    """A Database on a fresh store, with per-process index and admission state reset"""
+    if request.param == 'memory':
+        store = MemoryStore()
+    else:
+        store = SQLiteStore(str(tmp_path / 'store.sqlite3'))
+    monkeypatch.setattr(database, 'connect', lambda: StorageClient(store))
+    monkeypatch.setattr(database, 'SyntheticCatalog',
+                        partial(SyntheticCatalog, directory=str(tmp_path / 'synthetic')))
+    monkeypatch.setattr(database, 'INDEXED_DATABASES', set())
+    monkeypatch.setattr(database, 'READY_BUCKETS', set())
+    monkeypatch.setattr(admission, '_admission', None)
+    return Database(SURVEY_TYPE)
+
+
+def create_session(db, expires_in=timedelta(hours=1)):
+    session = {
+        'session_id': secrets.token_urlsafe(16),
+        'created_at': datetime.utcnow(),
+        'expires_at': datetime.utcnow() + expires_in,
+        'is_active': True,
+        'survey_type': SURVEY_TYPE,
+        'wrapped_key': db.encryptor.generate_data_key()
+    }
+    db.sessions.insert_one(session)
+    return session
+
+
+def make_response():
+    response = {}
+    for name, field in compile_survey(SURVEY_TYPE).fields.items():
+        if field['type'] == 'select':
+            response[name] = random.choice(field['options'])
+        else:
+            response[name] = random.randint(field['min'], field['max'])
+    return response
+
+
+def expire(db, session):
+    db.sessions.update_one({'session_id': session['session_id']},
+                           {'$set': {'expires_at': datetime.utcnow() - timedelta(seconds=1)}})
+
+
+def test_store_response_is_encrypted_and_aggregated(db):
+    session = create_session(db)
+    responses = [make_response() for _ in range(3)]
+    for response in responses:
+        db.store_response(response, session['session_id'])
+
+    stored = list(db.collection.find({'session_id': session['session_id']}))
+    assert len(stored) == 3
+    encryptor = db.session_encryptor(session)
+    assert sorted(encryptor.decrypt_data(doc['data'])['age'] for doc in stored) == \
+        sorted(response['age'] for response in responses)
+    assert db.load_session_aggregate(session).count == 3
+
+
+def test_store_response_rejects_unknown_and_expired_sessions(db):
+    with pytest.raises(Exception, match="Invalid session"):
+        db.store_response(make_response(), 'no-such-session')
+
+    session = create_session(db)
+    expire(db, session)
+    with pytest.raises(Exception, match="Invalid session"):
+        db.store_response(make_response(), session['session_id'])
+    assert db.collection.count_documents({}) == 0
+
+
+def test_idempotent_upsert_stores_once(db, monkeypatch):
+    session = create_session(db)
+    response = make_response()
+    db.store_response(response, session['session_id'], idempotency_key='submit-1')
+
+    # A fresh process has no memory of the key, so the upsert is what dedupes
+    monkeypatch.setattr(admission, '_admission', None)
+    assert db.store_response(response, session['session_id'], idempotency_key='submit-1') is None
+
+    assert db.collection.count_documents({'session_id': session['session_id']}) == 1
+    assert db.load_session_aggregate(session).count == 1
+
+
+def test_replay_is_idempotent(db):
+    session = create_session(db)
+    entries = [
+        {
+            'idempotency_key': f'journal-{index}',
+            'response_data': make_response(),
+            'journaled_at': datetime.utcnow(),
+            'counted': False
+        }
+        for index in range(4)
+    ]
+    assert db.replay_responses(session['session_id'], entries) == 4
+    assert db.replay_responses(session['session_id'], entries) == 0
+    assert db.collection.count_documents({'session_id': session['session_id']}) == 4
+    assert db.load_session_aggregate(session).count == 4
+
+
+def test_claim_leases_each_expired_session_once(db):
+    first = create_session(db)
+    second = create_session(db, timedelta(hours=2))
+    create_session(db)
+    expire(db, first)
+    expire(db, second)
+
+    now = datetime.utcnow()
+    claimed = [db.claim_expired_session(now), db.claim_expired_session(now)]
+    assert {session['session_id'] for session in claimed} == {first['session_id'], second['session_id']}
+    assert all(session['lease_owner'] == database.WORKER_ID for session in claimed)
+    assert db.claim_expired_session(now) is None
+
+
+def test_lapsed_lease_can_be_reclaimed(db):
+    session = create_session(db)
+    expire(db, session)
+    assert db.claim_expired_session(datetime.utcnow())['session_id'] == session['session_id']
+
+    db.sessions.update_one({'session_id': session['session_id']},
+                           {'$set': {'lease_expires_at': datetime.utcnow() - timedelta(seconds=1)}})
+    assert db.claim_expired_session(datetime.utcnow())['session_id'] == session['session_id']
+
+
+def test_cleanup_removes_expired_sessions(db):
+    expired = create_session(db)
+    active = create_session(db)
+    for session in (expired, active):
+        for _ in range(5):
+            db.store_response(make_response(), session['session_id'])
+    expire(db, expired)
+
+    processed, _ = db.run_cleanup_batch()
+    assert processed == 1
+    assert db.sessions.find_one({'session_id': expired['session_id']}) is None
+    assert db.aggregates.find_one({'session_id': expired['session_id']}) is None
+    assert db.sessions.find_one({'session_id': active['session_id']}) is not None
+    assert db.load_session_aggregate(active).count == 5
+    assert db.run_cleanup_batch()[0] == 0
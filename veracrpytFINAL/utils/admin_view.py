@@ -0,0 +1,21 @@
+import streamlit as st
+
+GENERATE_LINK = "📝 Generate Survey Link"
+VIEW_RESPONSES = "📊 View Responses"
+SYNTHETIC_DATA = "🔄 Synthetic Data"
+ADMIN_SECTIONS = [GENERATE_LINK, VIEW_RESPONSES, SYNTHETIC_DATA]
+
+
+def admin_section(survey_type):
+    """Section selector for a survey's admin view.
+
+    st.tabs runs the body of every tab on every rerun, so response scans and
+    cleanup ran on any click. Pages render only the section returned here.
+    """
+    return st.radio(
+        "Admin section",
+        ADMIN_SECTIONS,
+        horizontal=True,
+        key=f"admin_section_{survey_type}",
+        label_visibility="collapsed"
+    )
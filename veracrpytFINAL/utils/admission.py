@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import time
+from utils.config import (
+    SESSION_SUBMIT_RATE, SESSION_SUBMIT_BURST, SURVEY_SUBMIT_RATE, SURVEY_SUBMIT_BURST,
+    MAX_INFLIGHT_WRITES, INFLIGHT_WAIT_SECONDS
+)
+
+# Session buckets (and stored idempotency keys) kept in memory before the
+# least recently used is dropped
+MAX_TRACKED_SESSIONS = 10000
+
+
+class SubmissionRejected(Exception):
+    """A submission turned away by rate limiting or the response cap"""
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class AdmissionController:
+    """Per-process admission control on the submission write path.
+
+    Token buckets per session and per survey type reject floods early,
+    before any lookup or encryption, and a bounded semaphore caps the
+    writes in flight. A rate of 0 disables that limit. Limits are per
+    process, so the effective cluster-wide rate scales with workers.
+    """
+
+    def __init__(self, session_rate=SESSION_SUBMIT_RATE, session_burst=SESSION_SUBMIT_BURST,
+                 survey_rate=SURVEY_SUBMIT_RATE, survey_burst=SURVEY_SUBMIT_BURST,
+                 max_inflight=MAX_INFLIGHT_WRITES, inflight_wait=INFLIGHT_WAIT_SECONDS):
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.survey_rate = survey_rate
+        self.survey_burst = survey_burst
+        self.inflight_wait = inflight_wait
+        self.inflight = threading.BoundedSemaphore(max_inflight) if max_inflight else None
+        self.lock = threading.Lock()
+        self.session_buckets = OrderedDict()
+        self.survey_buckets = {}
+        self.stored_keys = OrderedDict()
+
+    def seen(self, session_id, idempotency_key):
+        """True if this process already stored (or journaled) the submission"""
+        with self.lock:
+            return (session_id, idempotency_key) in self.stored_keys
+
+    def remember(self, session_id, idempotency_key):
+        with self.lock:
+            self.stored_keys[(session_id, idempotency_key)] = True
+            if len(self.stored_keys) > MAX_TRACKED_SESSIONS:
+                self.stored_keys.popitem(last=False)
+
+    def _session_bucket(self, survey_type, session_id):
+        key = (survey_type, session_id)
+        bucket = self.session_buckets.pop(key, None) or TokenBucket(self.session_rate, self.session_burst)
+        self.session_buckets[key] = bucket
+        if len(self.session_buckets) > MAX_TRACKED_SESSIONS:
+            self.session_buckets.popitem(last=False)
+        return bucket
+
+    def check(self, survey_type, session_id):
+        """Take a token from the session and survey buckets or raise SubmissionRejected"""
+        with self.lock:
+            if self.session_rate and not self._session_bucket(survey_type, session_id).take():
+                raise SubmissionRejected("Too many submissions for this survey link; please wait a moment.")
+            if self.survey_rate:
+                if survey_type not in self.survey_buckets:
+                    self.survey_buckets[survey_type] = TokenBucket(self.survey_rate, self.survey_burst)
+                if not self.survey_buckets[survey_type].take():
+                    raise SubmissionRejected("This survey is receiving too many submissions; please try again shortly.")
+
+    @contextmanager
+    def admit(self, survey_type, session_id):
+        """Rate-limit, then hold an in-flight write slot for the duration of the block"""
+        self.check(survey_type, session_id)
+        if self.inflight is None:
+            yield
+            return
+        if not self.inflight.acquire(timeout=self.inflight_wait):
+            raise SubmissionRejected("The survey service is busy; please try again in a moment.")
+        try:
+            yield
+        finally:
+            self.inflight.release()
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_admission():
+    """The process-wide admission controller"""
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = AdmissionController()
+        return _admission
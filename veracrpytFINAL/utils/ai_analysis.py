@@ -0,0 +1,200 @@
+import abc
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import re
+import threading
+import time
+from utils.config import (
+    AI_BACKEND,
+    AI_MODEL,
+    AI_TIMEOUT_SECONDS,
+    AI_LOCAL_LATENCY_SECONDS,
+    AI_CACHE_SIZE,
+    AI_RETRY_BACKOFF_SECONDS,
+    AI_RETRY_BACKOFF_MAX_SECONDS
+)
+from utils.prompt_builder import build_merge_prompt
+
+SYSTEM_PROMPT = "You are a data analysis expert. Analyze the following synthetic dataset and provide insights."
+
+
+class AnalysisBackend(abc.ABC):
+    """Interface for services that turn a dataset description into insights"""
+
+    @abc.abstractmethod
+    def analyze(self, description, timeout):
+        """Return the analysis text, raising on failure or after `timeout` seconds"""
+
+
+class OpenAIBackend(AnalysisBackend):
+    """Chat completion backend using the OpenAI API"""
+
+    def __init__(self, model=AI_MODEL, api_key=None):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+
+    def analyze(self, description, timeout):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": f"Analyze this synthetic dataset: {description}"}
+            ],
+            timeout=timeout
+        )
+        return response.choices[0].message.content
+
+
+class LocalBackend(AnalysisBackend):
+    """Deterministic offline stand-in for testing and benchmarking the page.
+
+    The same description always yields the same text. `latency` simulates
+    model response time and is subject to the same timeout as a real call.
+    """
+
+    def __init__(self, latency=AI_LOCAL_LATENCY_SECONDS):
+        self.latency = latency
+
+    def analyze(self, description, timeout):
+        if self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Local analysis exceeded {timeout}s")
+        time.sleep(self.latency)
+
+        correlations = re.findall(r"^- (.+ and .+): (-?[\d.]+)$", description, re.MULTILINE)
+        digest = hashlib.sha256(description.encode('utf-8')).hexdigest()[:8]
+
+        lines = [f"Local analysis {digest} ({len(description)} characters of input)."]
+        if correlations:
+            lines.append("Notable relationships:")
+            for pair, corr in correlations:
+                direction = "positive" if float(corr) > 0 else "negative"
+                lines.append(f"- {pair}: {direction} correlation ({corr})")
+        else:
+            lines.append("No strong correlations were reported in the summary.")
+        return "\n".join(lines)
+
+
+def get_backend(name=AI_BACKEND):
+    """Build the configured analysis backend"""
+    if name == 'openai':
+        return OpenAIBackend()
+    if name == 'local':
+        return LocalBackend()
+    raise ValueError(f"Unknown AI backend: {name}")
+
+
+class AnalysisJobs:
+    """Runs analyses in background threads and caches results by description hash.
+
+    A failed or timed-out analysis is not resubmitted until its backoff has
+    passed, and never while its previous attempt is still occupying a worker,
+    so a hung backend cannot fill the pool one rerun at a time.
+    """
+
+    def __init__(self, backend, timeout=AI_TIMEOUT_SECONDS, max_workers=2, cache_size=AI_CACHE_SIZE,
+                 backoff=AI_RETRY_BACKOFF_SECONDS, max_backoff=AI_RETRY_BACKOFF_MAX_SECONDS):
+        self.backend = backend
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-analysis')
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._jobs = {}
+        # key -> (message, retry_at, attempts, future still running or None)
+        self._failures = {}
+
+    @staticmethod
+    def key(prompts):
+        return hashlib.sha256("\x1e".join(prompts).encode('utf-8')).hexdigest()
+
+    def _run(self, prompts):
+        if len(prompts) == 1:
+            return self.backend.analyze(prompts[0], self.timeout)
+        # Wide datasets: analyze each chunk, then merge the chunk summaries
+        summaries = [self.backend.analyze(prompt, self.timeout) for prompt in prompts]
+        return self.backend.analyze(build_merge_prompt(summaries), self.timeout)
+
+    def _cache(self, key, result):
+        self._results[key] = result
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    def _fail(self, key, message, future=None):
+        attempts = self._failures[key][2] + 1 if key in self._failures else 1
+        delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+        self._failures[key] = (message, time.monotonic() + delay, attempts, future)
+        return 'error', message
+
+    def _settle_orphan(self, key):
+        """Collect a timed-out attempt that has since finished; True if it still runs"""
+        message, retry_at, attempts, future = self._failures[key]
+        if future is None:
+            return False
+        if not future.done():
+            return True
+        self._failures[key] = (message, retry_at, attempts, None)
+        if not future.cancelled() and future.exception() is None:
+            # Late but usable: keep the answer rather than asking again
+            del self._failures[key]
+            self._cache(key, future.result())
+        return False
+
+    def submit(self, prompts):
+        """Start an analysis unless it is cached, running or backing off; returns its key.
+
+        `prompts` is one description or the chunk list from build_analysis_prompts.
+        """
+        if isinstance(prompts, str):
+            prompts = [prompts]
+        key = self.key(prompts)
+        with self._lock:
+            if key in self._results or key in self._jobs:
+                return key
+            if key in self._failures:
+                if self._settle_orphan(key) or time.monotonic() < self._failures[key][1]:
+                    return key
+            calls = len(prompts) + (1 if len(prompts) > 1 else 0)
+            deadline = time.monotonic() + self.timeout * calls + 5
+            self._jobs[key] = (self.executor.submit(self._run, prompts), deadline)
+        return key
+
+    def poll(self, key):
+        """Return ('done', text), ('pending', None) or ('error', message)"""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return 'done', self._results[key]
+
+            if key not in self._jobs:
+                if key in self._failures:
+                    self._settle_orphan(key)
+                    if key in self._results:
+                        return 'done', self._results[key]
+                    message, retry_at, _, _ = self._failures[key]
+                    wait = max(0, int(retry_at - time.monotonic()))
+                    return 'error', f"{message} (retrying in {wait}s)" if wait else message
+                return 'error', "Unknown analysis job"
+
+            future, deadline = self._jobs[key]
+            if not future.done():
+                # A backend that ignores its timeout must not stall the page forever;
+                # the attempt is kept so it is not resubmitted while still running
+                if time.monotonic() > deadline:
+                    del self._jobs[key]
+                    return self._fail(key, "Analysis timed out", None if future.cancel() else future)
+                return 'pending', None
+
+            del self._jobs[key]
+            try:
+                result = future.result()
+            except Exception as e:
+                return self._fail(key, str(e))
+
+            self._failures.pop(key, None)
+            self._cache(key, result)
+            return 'done', result
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def significant_correlations(corr_matrix, threshold=0.3):
+    """Extracts pairs from a correlation matrix where |correlation| > threshold"""
+    columns = list(corr_matrix.columns)
+    values = corr_matrix.to_numpy()
+
+    pairs = {}
+    for i in range(len(columns)):
+        for j in range(i+1, len(columns)):
+            corr = values[i, j]
+            if abs(corr) > threshold:
+                pairs[f"{columns[i]} and {columns[j]}"] = round(float(corr), 2)
+
+    return pairs
+
+
+def build_analytics_bundle(df, threshold=0.3, bins=30):
+    """Computes every summary the analysis views and AI prompt need in one pass.
+
+    Returns a dict with the numeric column list, correlation matrix, describe
+    table, per-column histogram bins and significant correlation pairs.
+    """
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    numeric_df = df[numeric_cols]
+    corr_matrix = numeric_df.corr()
+
+    histograms = {}
+    for col in numeric_cols:
+        values = numeric_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        counts, edges = np.histogram(values, bins=bins)
+        histograms[col] = {'counts': counts, 'edges': edges}
+
+    return {
+        'shape': df.shape,
+        'numeric_columns': numeric_cols,
+        'correlation_matrix': corr_matrix,
+        'describe': numeric_df.describe(),
+        'histograms': histograms,
+        'significant_correlations': significant_correlations(corr_matrix, threshold)
+    }
@@ -0,0 +1,154 @@
+from datetime import datetime
+import logging
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from utils.encryption import Encryptor
+from utils.database import (
+    bucket_name, response_slot_filter, session_encryptor, response_document,
+    folded_aggregate, aggregate_document, aggregate_swap, partial_document, stale_update,
+    RESPONSE_INDEXES, SESSION_INDEXES, AGGREGATE_INDEXES, PARTIAL_INDEXES, READY_BUCKETS
+)
+from utils.config import (
+    MONGO_URI, MONGO_OPTIONS, AGGREGATE_MAX_RETRIES, RESPONSE_LAYOUT, MAX_RESPONSES_PER_SESSION,
+    get_survey_config
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase:
+    """asyncio counterpart of Database's write path for the ingestion service.
+
+    Covers session lookup, response slots and batched response inserts on
+    Motor, so one event loop can keep many round-trips in flight. Documents,
+    aggregates and indexes come from the helpers in utils.database, so both
+    layers store the same thing.
+    """
+
+    def __init__(self, survey_type='mental_health', client=None):
+        config = get_survey_config(survey_type)
+        self.survey_type = survey_type
+        self.client = client or AsyncIOMotorClient(MONGO_URI, **MONGO_OPTIONS)
+        self.db = self.client[config['DATABASE_NAME']]
+        self.collection = self.db[config['COLLECTION_NAME']]
+        self.sessions = self.db['survey_sessions']
+        self.aggregates = self.db['session_aggregates']
+        self.partials = self.db['aggregate_partials']
+        self.encryptor = Encryptor(config['ENCRYPTION_KEY'])
+        self.session_keys = {}
+
+    async def ensure_indexes(self):
+        for collection, indexes in ((self.collection, RESPONSE_INDEXES),
+                                    (self.sessions, SESSION_INDEXES),
+                                    (self.aggregates, AGGREGATE_INDEXES),
+                                    (self.partials, PARTIAL_INDEXES)):
+            for keys, options in indexes:
+                await collection.create_index(keys, **options)
+
+    def session_encryptor(self, session):
+        return session_encryptor(self.encryptor, self.session_keys, session)
+
+    async def response_collection(self, session):
+        if RESPONSE_LAYOUT != 'hourly':
+            return self.collection
+
+        name = bucket_name(self.collection.name, session['expires_at'])
+        bucket = self.db[name]
+        if f"{self.db.name}.{name}" not in READY_BUCKETS:
+            for keys, options in RESPONSE_INDEXES:
+                await bucket.create_index(keys, **options)
+            READY_BUCKETS.add(f"{self.db.name}.{name}")
+        return bucket
+
+    async def get_active_session(self, session_id):
+        """Session document if it exists, is active and has not expired"""
+        if not session_id:
+            return None
+        return await self.sessions.find_one({
+            'session_id': session_id,
+            'expires_at': {'$gt': datetime.utcnow()},
+            'is_active': True
+        })
+
+    async def reserve_response_slot(self, session_id):
+        """Active session with its response counted against the cap, or None
+        when it expired or is full (see Database.reserve_response_slot)"""
+        if not MAX_RESPONSES_PER_SESSION:
+            return await self.get_active_session(session_id)
+        query = response_slot_filter(session_id, datetime.utcnow())
+        query['is_active'] = True
+        return await self.sessions.find_one_and_update(
+            query, {'$inc': {'response_count': 1}}, return_document=ReturnDocument.AFTER
+        )
+
+    async def release_response_slot(self, session_id):
+        if MAX_RESPONSES_PER_SESSION:
+            await self.sessions.update_one({'session_id': session_id}, {'$inc': {'response_count': -1}})
+
+    async def store_responses(self, session, responses, idempotency_keys=None):
+        """Store several responses of one session with a single insert_many.
+
+        Returns one entry per response: None if it was stored, otherwise its
+        write error from the BulkWriteError (code 11000 for an idempotency key
+        that is already stored). Only stored responses are folded into the
+        aggregate.
+        """
+        collection = await self.response_collection(session)
+        idempotency_keys = idempotency_keys or [None] * len(responses)
+        try:
+            await collection.insert_many(
+                [
+                    response_document(self.session_encryptor(session), session, response_data, idempotency_key)
+                    for response_data, idempotency_key in zip(responses, idempotency_keys)
+                ],
+                ordered=False
+            )
+            errors = {}
+        except BulkWriteError as e:
+            errors = {error['index']: error for error in e.details.get('writeErrors', [])}
+
+        stored = [response_data for index, response_data in enumerate(responses) if index not in errors]
+        if stored:
+            await self.fold_into_aggregate(session, stored)
+        return [errors.get(index) for index in range(len(responses))]
+
+    async def fold_into_aggregate(self, session, responses):
+        """Update the aggregate, marking it stale if that fails (see Database.fold_into_aggregate)"""
+        try:
+            await self.update_session_aggregate(session, responses)
+        except Exception:
+            logger.warning("Session aggregate not updated", exc_info=True)
+            try:
+                await self.aggregates.update_one({'session_id': session['session_id']}, stale_update(session), upsert=True)
+            except Exception:
+                logger.warning("Session aggregate could not be marked stale", exc_info=True)
+
+    async def update_session_aggregate(self, session, responses):
+        """Compare-and-swap update of the encrypted aggregate, as in Database"""
+        session_id = session['session_id']
+        encryptor = self.session_encryptor(session)
+
+        for attempt in range(AGGREGATE_MAX_RETRIES):
+            document = await self.aggregates.find_one({'session_id': session_id})
+            if document is not None and document.get('stale'):
+                return
+
+            aggregate = folded_aggregate(self.survey_type, encryptor, document, responses)
+            if document is None:
+                try:
+                    await self.aggregates.insert_one(aggregate_document(encryptor, session, aggregate))
+                    return
+                except DuplicateKeyError:
+                    continue
+
+            if (await self.aggregates.update_one(*aggregate_swap(encryptor, document, aggregate))).modified_count:
+                return
+
+        logger.warning("Aggregate of session %s contended %d times; storing a partial aggregate",
+                       session_id, AGGREGATE_MAX_RETRIES)
+        partial = folded_aggregate(self.survey_type, encryptor, None, responses)
+        await self.partials.insert_one(partial_document(encryptor, session, partial))
+
+    def close(self):
+        self.client.close()
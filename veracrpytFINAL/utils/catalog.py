@@ -0,0 +1,128 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.database import Database
+from bson import ObjectId
+from datetime import datetime
+from pathlib import Path
+import io
+import gridfs
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.config import SYNTHETIC_STORAGE, SYNTHETIC_DATA_DIR
+
+PARQUET_COMPRESSION = 'zstd'
+
+# Fields returned when listing; payloads and full correlation dicts stay out
+LIST_PROJECTION = {
+    'session_id': 1,
+    'filename': 1,
+    'row_count': 1,
+    'columns': 1,
+    'timings': 1,
+    'created_at': 1
+}
+
+
+class SyntheticCatalog:
+    """Persistent store of generated synthetic datasets for one survey type.
+
+    Metadata lives in the `synthetic_catalog` collection; payloads are
+    compressed Parquet files under SYNTHETIC_DATA_DIR or GridFS files,
+    depending on SYNTHETIC_STORAGE.
+    """
+
+    def __init__(self, db, survey_type, storage=SYNTHETIC_STORAGE, directory=SYNTHETIC_DATA_DIR):
+        if storage not in ('parquet', 'gridfs'):
+            raise ValueError(f"Unknown synthetic storage: {storage}")
+
+        self.survey_type = survey_type
+        self.storage = storage
+        self.collection = db['synthetic_catalog']
+
+        # Both are kept so datasets written under an earlier setting stay readable;
+        # GridFS needs a real MongoDB database, so the stand-in backends are Parquet-only
+        if isinstance(db, Database):
+            self.fs = gridfs.GridFS(db, collection='synthetic_payloads')
+        elif storage == 'gridfs':
+            raise ValueError("GridFS synthetic storage requires the 'mongo' storage backend")
+        else:
+            self.fs = None
+        self.directory = Path(directory) / survey_type
+
+    def ensure_ready(self):
+        """Create indexes and the payload directory; run once per process by Database"""
+        self.collection.create_index([("survey_type", ASCENDING), ("created_at", DESCENDING)])
+        self.collection.create_index([("session_id", ASCENDING)])
+        if self.storage == 'parquet':
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def save(self, df, session_id, original_correlations, synthetic_correlations, timings,
+             category_counts=None):
+        """Persist a synthetic dataset and its metadata; returns the dataset id"""
+        created_at = datetime.utcnow()
+        filename = f"synthetic_data_{session_id}_{created_at.strftime('%Y%m%d_%H%M%S')}.parquet"
+
+        document = {
+            'survey_type': self.survey_type,
+            'session_id': session_id,
+            'filename': filename,
+            'row_count': len(df),
+            'columns': list(df.columns),
+            'original_correlations': original_correlations,
+            'synthetic_correlations': synthetic_correlations,
+            'timings': timings,
+            'category_counts': category_counts,
+            'storage': self.storage,
+            'created_at': created_at
+        }
+
+        if self.storage == 'gridfs':
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, compression=PARQUET_COMPRESSION, index=False)
+            document['gridfs_id'] = self.fs.put(buffer.getvalue(), filename=filename)
+        else:
+            path = self.directory / filename
+            df.to_parquet(path, compression=PARQUET_COMPRESSION, index=False)
+            document['path'] = str(path)
+
+        return self.collection.insert_one(document).inserted_id
+
+    def has_session(self, session_id):
+        """Whether a dataset was already generated from this session"""
+        return self.collection.find_one(
+            {'session_id': session_id, 'survey_type': self.survey_type}, {'_id': 1}
+        ) is not None
+
+    def count(self):
+        return self.collection.count_documents({'survey_type': self.survey_type})
+
+    def list(self, limit=20, skip=0):
+        """Newest-first metadata page, served by the (survey_type, created_at) index"""
+        cursor = self.collection.find(
+            {'survey_type': self.survey_type},
+            LIST_PROJECTION
+        ).sort('created_at', DESCENDING).skip(skip).limit(limit)
+        return list(cursor)
+
+    def get(self, dataset_id):
+        """Full metadata for one dataset"""
+        return self.collection.find_one({'_id': ObjectId(dataset_id), 'survey_type': self.survey_type})
+
+    def load(self, dataset_id):
+        """Load a dataset's rows by id"""
+        document = self.get(dataset_id)
+        if document is None:
+            raise KeyError(f"Unknown synthetic dataset: {dataset_id}")
+        return self.load_document(document)
+
+    def load_document(self, document):
+        """Load the rows behind a catalog document; local Parquet files are memory-mapped"""
+        if document['storage'] == 'gridfs':
+            return pd.read_parquet(io.BytesIO(self.fs.get(document['gridfs_id']).read()))
+        return pd.read_parquet(document['path'], memory_map=True)
+
+    def open_payload(self, document):
+        """Open a dataset's Parquet payload for batch-wise reading"""
+        if document['storage'] == 'gridfs':
+            return pq.ParquetFile(pa.BufferReader(self.fs.get(document['gridfs_id']).read()))
+        return pq.ParquetFile(document['path'], memory_map=True)
@@ -0,0 +1,144 @@
+import numpy as np
+import plotly.graph_objects as go
+from utils.config import (
+    PLOT_WEBGL_THRESHOLD,
+    PLOT_DENSITY_THRESHOLD,
+    PLOT_MAX_POINTS,
+    PLOT_DENSITY_BINS
+)
+
+# Every builder below keeps the number of values shipped to the browser at
+# roughly PLOT_MAX_POINTS per trace (or PLOT_DENSITY_BINS² cells), no matter
+# how many synthetic rows there are.
+
+
+def _values(series):
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def lttb_downsample(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling of a line to n_out points"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    bucket_size = (n - 2) / (n_out - 2)
+    sampled = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+
+        # Average of the next bucket is the third vertex of the triangle
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        sampled.append(a)
+
+    sampled.append(n - 1)
+    index = np.array(sampled)
+    return x[index], y[index]
+
+
+def _sample_index(n, n_out):
+    """Evenly spaced, deterministic row sample so reruns draw the same chart"""
+    if n <= n_out:
+        return np.arange(n)
+    return np.linspace(0, n - 1, n_out).astype(int)
+
+
+def box_trace(series, stats, name):
+    """Box plot; large columns use precomputed quartiles instead of raw values"""
+    if len(series) <= PLOT_WEBGL_THRESHOLD:
+        return go.Box(y=series, name=name, boxpoints='outliers')
+
+    return go.Box(
+        name=name,
+        q1=[stats['25%']],
+        median=[stats['50%']],
+        q3=[stats['75%']],
+        lowerfence=[stats['min']],
+        upperfence=[stats['max']],
+        mean=[stats['mean']],
+        sd=[stats['std']]
+    )
+
+
+def scatter_traces(x_series, y_series, name, trend=False):
+    """Scatter of two columns, switching to WebGL and then to a binned heatmap"""
+    x = _values(x_series)
+    y = _values(y_series)
+    n = len(x)
+    traces = []
+
+    if n <= PLOT_WEBGL_THRESHOLD:
+        traces.append(go.Scatter(x=x, y=y, mode='markers', name=name,
+                                 marker=dict(size=8, opacity=0.6)))
+    elif n <= PLOT_DENSITY_THRESHOLD:
+        index = _sample_index(n, PLOT_MAX_POINTS)
+        traces.append(go.Scattergl(x=x[index], y=y[index], mode='markers', name=name,
+                                   marker=dict(size=5, opacity=0.5)))
+    else:
+        mask = ~(np.isnan(x) | np.isnan(y))
+        counts, x_edges, y_edges = np.histogram2d(x[mask], y[mask], bins=PLOT_DENSITY_BINS)
+        traces.append(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=counts.T,
+            colorscale='Blues',
+            name=f'{name} (density)'
+        ))
+
+    if trend:
+        # A fitted line only needs its two end points
+        mask = ~(np.isnan(x) | np.isnan(y))
+        slope, intercept = np.polyfit(x[mask], y[mask], 1)
+        x_line = np.array([x[mask].min(), x[mask].max()])
+        traces.append(go.Scatter(
+            x=x_line,
+            y=slope * x_line + intercept,
+            name='Trend Line',
+            line=dict(color='blue', dash='dash')
+        ))
+
+    return traces
+
+
+def series_traces(df, columns, plot_type):
+    """Per-column traces for the custom analysis plot types"""
+    traces = []
+    n = len(df)
+
+    for col in columns:
+        y = _values(df[col])
+
+        if plot_type in ("Line Plot", "Area Plot"):
+            x = np.arange(n, dtype=np.float64)
+            if n > PLOT_MAX_POINTS:
+                x, y = lttb_downsample(x, y, PLOT_MAX_POINTS)
+            if plot_type == "Line Plot":
+                traces.append(go.Scatter(x=x, y=y, name=f'{col}', mode='lines'))
+            else:
+                traces.append(go.Scatter(x=x, y=y, name=f'{col}', fill='tonexty'))
+
+        elif plot_type == "Bar Plot":
+            if n <= PLOT_MAX_POINTS:
+                traces.append(go.Bar(name=f'{col}', y=y, x=df.index))
+            else:
+                # Aggregate consecutive rows into PLOT_MAX_POINTS mean bars
+                edges = np.linspace(0, n, PLOT_MAX_POINTS + 1).astype(int)
+                means = np.add.reduceat(np.nan_to_num(y), edges[:-1]) / np.diff(edges)
+                traces.append(go.Bar(name=f'{col} (mean per {n // PLOT_MAX_POINTS}+ rows)',
+                                     y=means, x=edges[:-1]))
+
+        elif plot_type == "Violin Plot":
+            index = _sample_index(n, PLOT_MAX_POINTS)
+            traces.append(go.Violin(y=y[index], name=f'{col}', side='positive'))
+
+    return traces
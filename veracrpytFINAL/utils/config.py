@@ -1,5 +1,7 @@
 from dotenv import load_dotenv
 import os
+from pathlib import Path
+from utils.surveys import SURVEYS
 
 load_dotenv()
 
@@ -12,29 +14,110 @@ MONGO_OPTIONS = {
     'w': 'majority'
 }
 
+# Storage backend: 'mongo', or the 'sqlite' (WAL) and 'memory' stand-ins in utils/storage.py
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongo')
+SQLITE_PATH = os.getenv('SQLITE_PATH', str(Path(__file__).parent.parent / 'veracrypt.sqlite3'))
+
+# Circuit breaker for MongoDB: after BREAKER_FAILURE_THRESHOLD failed pings, calls
+# fail immediately and a background probe retries every BREAKER_COOLDOWN_SECONDS
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 2))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv('BREAKER_COOLDOWN_SECONDS', 15))
+HEALTH_CACHE_SECONDS = float(os.getenv('HEALTH_CACHE_SECONDS', 5))
+
+# Local encrypted journal that takes submissions while the database is unreachable
+JOURNAL_PATH = os.getenv('JOURNAL_PATH', str(Path(__file__).parent.parent / 'submission_journal.sqlite3'))
+JOURNAL_REPLAY_SECONDS = float(os.getenv('JOURNAL_REPLAY_SECONDS', 10))
+JOURNAL_REPLAY_BATCH = int(os.getenv('JOURNAL_REPLAY_BATCH', 500))
+
+# Upper bound on links created by one bulk generation
+MAX_BULK_LINKS = int(os.getenv('MAX_BULK_LINKS', 2000))
+
+# Submission admission control (per process; a rate of 0 disables that limit).
+# One link is usually shared by a whole class, so the per-link limit is off by default
+SESSION_SUBMIT_RATE = float(os.getenv('SESSION_SUBMIT_RATE', 0))  # tokens per second per session link
+SESSION_SUBMIT_BURST = int(os.getenv('SESSION_SUBMIT_BURST', 100))
+SURVEY_SUBMIT_RATE = float(os.getenv('SURVEY_SUBMIT_RATE', 50))  # tokens per second per survey type
+SURVEY_SUBMIT_BURST = int(os.getenv('SURVEY_SUBMIT_BURST', 200))
+MAX_INFLIGHT_WRITES = int(os.getenv('MAX_INFLIGHT_WRITES', 32))
+INFLIGHT_WAIT_SECONDS = float(os.getenv('INFLIGHT_WAIT_SECONDS', 2))
+# Responses accepted per session link, enforced by an atomic counter (0 means unlimited)
+MAX_RESPONSES_PER_SESSION = int(os.getenv('MAX_RESPONSES_PER_SESSION', 0))
+
+# Parser used for uploaded CSV files ('pyarrow' is fastest, 'c' is the pandas default)
+CSV_ENGINE = os.getenv('CSV_ENGINE', 'pyarrow')
+
+# Chart rendering thresholds (rows) for large synthetic datasets
+PLOT_WEBGL_THRESHOLD = int(os.getenv('PLOT_WEBGL_THRESHOLD', 1000))
+PLOT_DENSITY_THRESHOLD = int(os.getenv('PLOT_DENSITY_THRESHOLD', 20000))
+PLOT_MAX_POINTS = int(os.getenv('PLOT_MAX_POINTS', 2000))
+PLOT_DENSITY_BINS = int(os.getenv('PLOT_DENSITY_BINS', 100))
+
+# AI analysis backend ('openai' or the deterministic offline 'local' stand-in)
+AI_BACKEND = os.getenv('AI_BACKEND', 'openai')
+AI_MODEL = os.getenv('AI_MODEL', 'gpt-4')
+AI_TIMEOUT_SECONDS = float(os.getenv('AI_TIMEOUT_SECONDS', 60))
+AI_LOCAL_LATENCY_SECONDS = float(os.getenv('AI_LOCAL_LATENCY_SECONDS', 0))
+AI_CACHE_SIZE = int(os.getenv('AI_CACHE_SIZE', 128))
+# Failed or timed-out analyses are retried after this delay, doubling up to the maximum
+AI_RETRY_BACKOFF_SECONDS = float(os.getenv('AI_RETRY_BACKOFF_SECONDS', 10))
+AI_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv('AI_RETRY_BACKOFF_MAX_SECONDS', 300))
+
+# Upper bound on the size of each AI analysis prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', 3000))
+PROMPT_MAX_CORRELATIONS = int(os.getenv('PROMPT_MAX_CORRELATIONS', 25))
+
+# Synthetic dataset catalog payloads: compressed 'parquet' files or 'gridfs'
+SYNTHETIC_STORAGE = os.getenv('SYNTHETIC_STORAGE', 'parquet')
+SYNTHETIC_DATA_DIR = os.getenv(
+    'SYNTHETIC_DATA_DIR',
+    str(Path(__file__).parent.parent / 'synthetic_data')
+)
+SYNTHETIC_PAGE_SIZE = int(os.getenv('SYNTHETIC_PAGE_SIZE', 10))
+
+# Rows decoded per chunk when encoding synthetic dataset downloads
+EXPORT_BATCH_ROWS = int(os.getenv('EXPORT_BATCH_ROWS', 50000))
+
+# Per-session encrypted aggregates kept up to date at submission time
+AGGREGATE_RESERVOIR_SIZE = int(os.getenv('AGGREGATE_RESERVOIR_SIZE', 500))
+AGGREGATE_MAX_RETRIES = int(os.getenv('AGGREGATE_MAX_RETRIES', 5))
+
+# Responses and aggregates of expired sessions are unreadable once the session's
+# data key is destroyed; their ciphertext is purged by TTL after this grace period
+RESPONSE_PURGE_GRACE_HOURS = float(os.getenv('RESPONSE_PURGE_GRACE_HOURS', 24))
+
+# Response storage layout: one 'single' collection, or 'hourly' collections
+# bucketed by session expiry that cleanup drops once they are fully expired
+RESPONSE_LAYOUT = os.getenv('RESPONSE_LAYOUT', 'single')
+
+# Session ids per batched $in delete during cleanup
+CLEANUP_BATCH_SIZE = int(os.getenv('CLEANUP_BATCH_SIZE', 500))
+
+# How long a cleanup worker may hold an expired session before others can reclaim it
+CLEANUP_LEASE_SECONDS = int(os.getenv('CLEANUP_LEASE_SECONDS', 300))
+
+# Work done by one cleanup call; the rest of the backlog is left for later calls
+CLEANUP_MAX_SESSIONS = int(os.getenv('CLEANUP_MAX_SESSIONS', 50))
+CLEANUP_TIME_BUDGET_SECONDS = float(os.getenv('CLEANUP_TIME_BUDGET_SECONDS', 5))
+
+# Background thread that runs cleanup at session deadlines instead of on page loads
+EXPIRY_SCHEDULER_ENABLED = os.getenv('EXPIRY_SCHEDULER_ENABLED', 'true').lower() == 'true'
+EXPIRY_SCHEDULER_RESYNC_SECONDS = float(os.getenv('EXPIRY_SCHEDULER_RESYNC_SECONDS', 600))
+# First retry delay after the scheduler hits a database error (doubles up to the resync interval)
+EXPIRY_SCHEDULER_RETRY_SECONDS = float(os.getenv('EXPIRY_SCHEDULER_RETRY_SECONDS', 5))
+
+# HTTP ingestion service (ingest.py)
+INGEST_MAX_POOL_SIZE = int(os.getenv('INGEST_MAX_POOL_SIZE', 100))
+INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 100))
+INGEST_BATCH_WAIT_MS = float(os.getenv('INGEST_BATCH_WAIT_MS', 10))
+
 # Function to get configuration based on the survey type
 def get_survey_config(survey_type):
-    if survey_type == 'mental_health':
-        database_name = 'mental_health_survey_db'
-        base_url = os.getenv('MENTAL_HEALTH_BASE_URL', 'http://localhost:8501/mental_health')
-    elif survey_type == 'sexual_health':
-        database_name = 'sexual_health_survey_db'
-        base_url = os.getenv('SEXUAL_HEALTH_BASE_URL', 'http://localhost:8501/sexual_health')
-    elif survey_type == 'diversity_equality':
-        database_name = 'diversity_equality_survey_db'
-        base_url = os.getenv('DIVERSITY_EQUALITY_BASE_URL', 'http://localhost:8501/diversity_equality')
-    elif survey_type == 'academic_integrity':
-        database_name = 'academic_integrity_survey_db'
-        base_url = os.getenv('ACADEMIC_INTEGRITY_BASE_URL', 'http://localhost:8501/academic_integrity')
-    elif survey_type == 'socioeconomic_status':
-        database_name = 'socio_economic_survey_db'
-        base_url = os.getenv('SOCIOECONOMIC_STATUS_BASE_URL', 'http://localhost:8501/socioeconomic_status')
-    elif survey_type == 'substance_use':
-        database_name = 'substance_use_survey_db'
-        base_url = os.getenv('SUBSTANCE_USE_BASE_URL', 'http://localhost:8501/substance_use')
-    else:
+    if survey_type not in SURVEYS:
         raise ValueError('Invalid survey type')
 
+    database_name = SURVEYS[survey_type]['database_name']
+    base_url = os.getenv(SURVEYS[survey_type]['base_url_env'], f'http://localhost:8501/{survey_type}')
+
     collection_name = 'responses'
     encryption_key = os.getenv('ENCRYPTION_KEY', 'default_encryption_key_12345'.ljust(32, '0'))
 
@@ -0,0 +1,97 @@
+from pathlib import Path
+import pandas as pd
+from utils.config import CSV_ENGINE
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Upload extensions accepted by the analysis hub, grouped by reader
+CSV_EXTENSIONS = ('csv',)
+PARQUET_EXTENSIONS = ('parquet', 'pq')
+FEATHER_EXTENSIONS = ('feather', 'arrow', 'ipc')
+SUPPORTED_EXTENSIONS = CSV_EXTENSIONS + PARQUET_EXTENSIONS + FEATHER_EXTENSIONS
+
+# Columns that are bookkeeping, never survey answers
+EXCLUDED_COLUMNS = ('_id', 'created_at', 'expires_at')
+
+
+def _extension(name):
+    return Path(name).suffix.lower().lstrip('.')
+
+
+def _open_source(source):
+    """Return a pyarrow input for a path or an uploaded file without copying it"""
+    if isinstance(source, (str, Path)):
+        # Files on disk are memory-mapped so only touched pages are read
+        return pa.memory_map(str(source), 'r')
+    # Streamlit's UploadedFile is already an in-memory buffer; wrap it zero-copy
+    return pa.BufferReader(pa.py_buffer(source.getbuffer()))
+
+
+def _numeric_columns(schema):
+    """Names of numeric, non-bookkeeping fields in an Arrow schema"""
+    return [
+        field.name for field in schema
+        if (pa.types.is_integer(field.type) or pa.types.is_floating(field.type))
+        and field.name not in EXCLUDED_COLUMNS
+    ]
+
+
+def _to_frame(table):
+    """Convert an Arrow table to an Arrow-backed DataFrame (no NumPy copy)"""
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _read_parquet(source):
+    parquet_file = pq.ParquetFile(_open_source(source))
+    columns = _numeric_columns(parquet_file.schema_arrow)
+    # Column projection: only the numeric column chunks are decoded
+    return _to_frame(parquet_file.read(columns=columns))
+
+
+def _read_feather(source):
+    # Feather v2 and Arrow IPC files share the same format; for uncompressed
+    # files the record batches reference the mapped buffers directly
+    reader = pa_ipc.open_file(_open_source(source))
+    table = reader.read_all().select(_numeric_columns(reader.schema))
+    return _to_frame(table)
+
+
+def _read_csv(source, engine):
+    if engine == 'pyarrow' and pa is not None:
+        # The multithreaded Arrow parser skips pandas' per-cell type inference
+        table = pa_csv.read_csv(_open_source(source))
+        return _to_frame(table.select(_numeric_columns(table.schema)))
+
+    df = pd.read_csv(source, engine=engine if engine != 'pyarrow' else 'c')
+    numeric_df = df.select_dtypes(include='number')
+    return numeric_df.drop(columns=[col for col in EXCLUDED_COLUMNS if col in numeric_df.columns])
+
+
+def load_numeric_dataset(source, engine=CSV_ENGINE):
+    """Load the numeric columns of a CSV, Parquet, Feather or Arrow IPC file.
+
+    `source` is a filesystem path or a Streamlit UploadedFile. Columnar formats
+    are projected to numeric columns before decoding and returned as
+    Arrow-backed frames ready for synthetic data generation.
+    """
+    name = source.name if hasattr(source, 'name') else str(source)
+    extension = _extension(name)
+
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: .{extension}")
+
+    if extension in CSV_EXTENSIONS:
+        return _read_csv(source, engine)
+
+    if pa is None:
+        raise ValueError("pyarrow is required to read Parquet, Feather and Arrow files")
+
+    if extension in PARQUET_EXTENSIONS:
+        return _read_parquet(source)
+    return _read_feather(source)
@@ -1,48 +1,231 @@
-from pymongo import MongoClient, ASCENDING
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo import ASCENDING, DeleteMany, ReturnDocument
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, DuplicateKeyError, BulkWriteError
 from datetime import datetime, timedelta
 from utils.encryption import Encryptor
-from utils.config import MONGO_URI, MONGO_OPTIONS, get_survey_config
+from utils.storage import connect, ensure_available, get_breaker, StorageClient
+from utils.journal import get_journal
+from utils.admission import get_admission, SubmissionRejected
+from utils.analytics import significant_correlations
+from utils.catalog import SyntheticCatalog
+from utils.exports import export_dataset
+from utils.survey_engine import compile_survey
+from utils.session_stats import SessionAggregate
+from utils.config import (
+    AGGREGATE_MAX_RETRIES, RESPONSE_PURGE_GRACE_HOURS, RESPONSE_LAYOUT,
+    CLEANUP_BATCH_SIZE, CLEANUP_LEASE_SECONDS, CLEANUP_MAX_SESSIONS, CLEANUP_TIME_BUDGET_SECONDS,
+    MAX_RESPONSES_PER_SESSION,
+    get_survey_config
+)
 import streamlit as st
 import pandas as pd
 import numpy as np
+import logging
+import os
+import socket
+import time
+import uuid
 from sklearn.preprocessing import StandardScaler
 
+logger = logging.getLogger(__name__)
+
+# Hourly response buckets are named <collection>_<YYYYMMDDHH of session expiry>
+BUCKET_FORMAT = '%Y%m%d%H'
+
+# Duplicate submissions (same session and idempotency key) are rejected by this index
+IDEMPOTENCY_INDEX = [("session_id", ASCENDING), ("idempotency_key", ASCENDING)]
+IDEMPOTENCY_INDEX_OPTIONS = {
+    'unique': True,
+    'partialFilterExpression': {'idempotency_key': {'$exists': True}}
+}
+
+# Databases whose indexes this process has already ensured
+INDEXED_DATABASES = set()
+
+# Hourly buckets ("<database>.<bucket>") whose indexes this process has already ensured
+READY_BUCKETS = set()
+
+# Identifies this process as the owner of the cleanup leases it takes
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# Query and document helpers shared with the asyncio storage layer (utils/async_database.py)
+
+def bucket_name(collection_name, expires_at):
+    return f"{collection_name}_{expires_at.strftime(BUCKET_FORMAT)}"
+
+
+def purge_time(session):
+    """When the ciphertext of an expired session is reclaimed by TTL"""
+    return session['expires_at'] + timedelta(hours=RESPONSE_PURGE_GRACE_HOURS)
+
+
+def claim_filter(current_time, now):
+    """Expired sessions that nobody holds, or whose lease has lapsed"""
+    return {
+        'expires_at': {'$lte': current_time},
+        '$or': [
+            {'cleanup_state': {'$exists': False}},
+            {'cleanup_state': 'claimed', 'lease_expires_at': {'$lte': now}}
+        ]
+    }
+
+
+def response_slot_filter(session_id, now, count=1):
+    """Matches an unexpired session that still has room for `count` responses"""
+    query = {'session_id': session_id, 'expires_at': {'$gt': now}}
+    if MAX_RESPONSES_PER_SESSION:
+        query['$or'] = [
+            {'response_count': {'$exists': False}},
+            {'response_count': {'$lte': MAX_RESPONSES_PER_SESSION - count}}
+        ]
+    return query
+
+
+def claim_update(now):
+    return {'$set': {
+        'cleanup_state': 'claimed',
+        'lease_owner': WORKER_ID,
+        'lease_expires_at': now + timedelta(seconds=CLEANUP_LEASE_SECONDS)
+    }}
+
+
+# Indexes as (keys, options); response indexes apply to the base collection and every hourly bucket
+RESPONSE_INDEXES = [
+    ([("session_id", ASCENDING)], {}),
+    ([("expires_at", ASCENDING)], {}),
+    ([("purge_at", ASCENDING)], {'expireAfterSeconds': 0}),
+    (IDEMPOTENCY_INDEX, IDEMPOTENCY_INDEX_OPTIONS)
+]
+SESSION_INDEXES = [([("expires_at", ASCENDING)], {})]
+AGGREGATE_INDEXES = [
+    ([("session_id", ASCENDING)], {'unique': True}),
+    ([("purge_at", ASCENDING)], {'expireAfterSeconds': 0})
+]
+PARTIAL_INDEXES = [
+    ([("session_id", ASCENDING)], {}),
+    ([("purge_at", ASCENDING)], {'expireAfterSeconds': 0})
+]
+
+
+def session_encryptor(encryptor, session_keys, session):
+    """Encryptor for a session's data key, unwrapped once into session_keys;
+    sessions created before per-session keys fall back to the master key"""
+    wrapped_key = session.get('wrapped_key')
+    if not wrapped_key:
+        return encryptor
+    if session['session_id'] not in session_keys:
+        session_keys[session['session_id']] = encryptor.unwrap(wrapped_key)
+    return session_keys[session['session_id']]
+
+
+def response_document(encryptor, session, response_data, idempotency_key=None):
+    """Stored form of one response"""
+    document = {
+        'data': encryptor.encrypt_data(response_data),
+        'session_id': session['session_id'],
+        'created_at': datetime.utcnow(),
+        'expires_at': session['expires_at']
+    }
+    if session.get('wrapped_key'):
+        document['purge_at'] = purge_time(session)
+    if idempotency_key:
+        document['idempotency_key'] = idempotency_key
+    return document
+
+
+def folded_aggregate(survey_type, encryptor, document, responses):
+    """The aggregate stored in `document` (a fresh one if None) with responses added"""
+    if document is None:
+        aggregate = SessionAggregate.for_survey(compile_survey(survey_type))
+    else:
+        aggregate = SessionAggregate.from_dict(encryptor.decrypt_data(document['data']))
+    for response_data in responses:
+        aggregate.add(response_data)
+    return aggregate
+
+
+def aggregate_document(encryptor, session, aggregate):
+    """First stored version of a session's aggregate"""
+    return {
+        'session_id': session['session_id'],
+        'data': encryptor.encrypt_data(aggregate.to_dict()),
+        'version': 1,
+        'stale': False,
+        'expires_at': session['expires_at'],
+        'purge_at': purge_time(session)
+    }
+
+
+def aggregate_swap(encryptor, document, aggregate):
+    """Filter and update replacing `document` with `aggregate` only if its version is unchanged"""
+    return (
+        {'_id': document['_id'], 'version': document['version']},
+        {'$set': {'data': encryptor.encrypt_data(aggregate.to_dict())}, '$inc': {'version': 1}}
+    )
+
+
+def partial_document(encryptor, session, aggregate):
+    """An aggregate of responses that lost the compare-and-swap, merged back in at load"""
+    return {
+        'session_id': session['session_id'],
+        'data': encryptor.encrypt_data(aggregate.to_dict()),
+        'expires_at': session['expires_at'],
+        'purge_at': purge_time(session)
+    }
+
+
+def merged_aggregate(encryptor, document, partials):
+    """The aggregate in `document` with its partial aggregates merged in, or None if stale"""
+    if document is None or document.get('stale'):
+        return None
+    aggregate = SessionAggregate.from_dict(encryptor.decrypt_data(document['data']))
+    for partial in partials:
+        aggregate.merge(SessionAggregate.from_dict(encryptor.decrypt_data(partial['data'])))
+    return aggregate
+
+
+def stale_update(session):
+    """Marks a session's aggregate unusable, so synthesis rebuilds from the responses"""
+    return {'$set': {'stale': True, 'purge_at': purge_time(session)}}
+
+
 class Database:
     def __init__(self, survey_type='mental_health'):
         try:
             config = get_survey_config(survey_type)
-            self.client = MongoClient(MONGO_URI, **MONGO_OPTIONS)
-            self.client.admin.command('ping')
+            self.survey_type = survey_type
+            self.client = connect()
+            ensure_available(self.client)
             
             self.db = self.client[config['DATABASE_NAME']]
             self.collection = self.db[config['COLLECTION_NAME']]
             self.sessions = self.db['survey_sessions']
+            self.aggregates = self.db['session_aggregates']
+            self.partials = self.db['aggregate_partials']
+            self.checkpoints = self.db['cleanup_checkpoints']
             self.encryptor = Encryptor(config['ENCRYPTION_KEY'])
+            self.session_keys = {}
+            self.catalog = SyntheticCatalog(self.db, survey_type)
             
-            # Create indices
-            self.collection.create_index([("session_id", ASCENDING)])
-            self.collection.create_index([("expires_at", ASCENDING)])
-            self.sessions.create_index([("expires_at", ASCENDING)])
+            # Create indices once per process and database
+            if self.db.name not in INDEXED_DATABASES:
+                for collection, indexes in ((self.collection, RESPONSE_INDEXES),
+                                            (self.sessions, SESSION_INDEXES),
+                                            (self.aggregates, AGGREGATE_INDEXES),
+                                            (self.partials, PARTIAL_INDEXES)):
+                    for keys, options in indexes:
+                        collection.create_index(keys, **options)
+                self.catalog.ensure_ready()
+                INDEXED_DATABASES.add(self.db.name)
             
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
             st.error("MongoDB Connection Error. Please check your connection.")
-            raise Exception(f"MongoDB Connection Error: {str(e)}")
+            raise ConnectionFailure(f"MongoDB Connection Error: {str(e)}")
         
     def get_significant_correlations(self, df, threshold=0.3):
         """Extracts significant correlations where |correlation| > threshold"""
         numerical_cols = df.select_dtypes(include=[np.number]).columns
-        corr_matrix = df[numerical_cols].corr()
-        
-        significant_correlations = {}
-        for i in range(len(numerical_cols)):
-            for j in range(i+1, len(numerical_cols)):
-                corr = corr_matrix.iloc[i, j]
-                if abs(corr) > threshold:
-                    pair = f"{numerical_cols[i]} and {numerical_cols[j]}"
-                    significant_correlations[pair] = round(corr, 2)
-        
-        return significant_correlations
+        return significant_correlations(df[numerical_cols].corr(), threshold)
 
     def enforce_value_bounds(self, synthetic_df, original_df):
         """Ensures values stay within min-max range of the original dataset."""
@@ -59,7 +242,9 @@ class Database:
         synthetic_data = {}
         
         for col in numerical_cols:
-            data = original_df[col].values
+            # Works for NumPy and Arrow-backed columns; Arrow float64 without
+            # nulls is exposed without a copy
+            data = original_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
             
             # Check for constant values
             if len(np.unique(data)) <= 1:
@@ -148,126 +333,490 @@ class Database:
         
         return best_df
 
-    def generate_synthetic_data_from_session(self, session_id):
-        """Generate synthetic data from a session before deletion"""
-        try:
-            # Get all responses for the session
-            responses = self.collection.find({'session_id': session_id})
-            
-            # Decrypt and compile responses into a DataFrame
-            decrypted_data = []
-            for response in responses:
-                data = self.encryptor.decrypt_data(response['data'])
-                decrypted_data.append(data)
-            
-            if not decrypted_data:
-                return None
-                
-            original_df = pd.DataFrame(decrypted_data)
-            
-            # Process numerical columns, excluding certain fields
-            exclude_columns = ['created_at', 'expires_at', '_id']
-            numerical_df = original_df.select_dtypes(include=[np.number]).drop(
-                columns=[col for col in exclude_columns if col in original_df.columns]
+    def response_collection(self, session):
+        """Collection holding a session's responses under RESPONSE_LAYOUT"""
+        if RESPONSE_LAYOUT != 'hourly':
+            return self.collection
+
+        name = bucket_name(self.collection.name, session['expires_at'])
+        bucket = self.db[name]
+        if f"{self.db.name}.{name}" not in READY_BUCKETS:
+            for keys, options in RESPONSE_INDEXES:
+                bucket.create_index(keys, **options)
+            READY_BUCKETS.add(f"{self.db.name}.{name}")
+        return bucket
+
+    def bucket_names(self):
+        """Names of the existing hourly response buckets, oldest first"""
+        pattern = f"^{self.collection.name}_\\d{{10}}$"
+        return sorted(self.db.list_collection_names(filter={'name': {'$regex': pattern}}))
+
+    def response_collections(self):
+        """Every collection that may hold responses; reads fan out across these.
+        The base collection stays included for responses stored before the
+        layout was switched to 'hourly'."""
+        if RESPONSE_LAYOUT != 'hourly':
+            return [self.collection]
+        return [self.collection] + [self.db[name] for name in self.bucket_names()]
+
+    def drop_expired_buckets(self, current_time):
+        """Drop hourly buckets whose whole expiry window has passed and whose
+        sessions have all been synthesized and removed. Sessions still leased
+        by another worker keep their bucket alive.
+        """
+        if RESPONSE_LAYOUT != 'hourly':
+            return
+        for name in self.bucket_names():
+            window_start = datetime.strptime(name.rsplit('_', 1)[1], BUCKET_FORMAT)
+            window_end = window_start + timedelta(hours=1)
+            if window_end > current_time:
+                continue
+            remaining = self.sessions.count_documents(
+                {'expires_at': {'$gte': window_start, '$lt': window_end}}, limit=1
             )
-            
-            if numerical_df.empty:
+            if not remaining:
+                self.db.drop_collection(name)
+                READY_BUCKETS.discard(f"{self.db.name}.{name}")
+
+    def session_encryptor(self, session):
+        return session_encryptor(self.encryptor, self.session_keys, session)
+
+    def update_session_aggregate(self, session, responses):
+        """Fold responses into the session's encrypted aggregate.
+
+        The aggregate is rewritten with a compare-and-swap on its version, so
+        concurrent submissions never lose an update. If the retries run out the
+        responses are stored as a partial aggregate instead, which
+        load_session_aggregate merges back in.
+        """
+        session_id = session['session_id']
+        encryptor = self.session_encryptor(session)
+
+        for attempt in range(AGGREGATE_MAX_RETRIES):
+            document = self.aggregates.find_one({'session_id': session_id})
+            if document is not None and document.get('stale'):
+                return
+
+            aggregate = folded_aggregate(self.survey_type, encryptor, document, responses)
+            if document is None:
+                try:
+                    self.aggregates.insert_one(aggregate_document(encryptor, session, aggregate))
+                    return
+                except DuplicateKeyError:
+                    continue
+
+            if self.aggregates.update_one(*aggregate_swap(encryptor, document, aggregate)).modified_count:
+                return
+
+        logger.warning("Aggregate of session %s contended %d times; storing a partial aggregate",
+                       session_id, AGGREGATE_MAX_RETRIES)
+        partial = folded_aggregate(self.survey_type, encryptor, None, responses)
+        self.partials.insert_one(partial_document(encryptor, session, partial))
+
+    def load_session_aggregate(self, session):
+        """Decrypted aggregate for a session with its partials merged in, or
+        None if missing or stale"""
+        document = self.aggregates.find_one({'session_id': session['session_id']})
+        partials = self.partials.find({'session_id': session['session_id']})
+        aggregate = merged_aggregate(self.session_encryptor(session), document, partials)
+        return aggregate if aggregate is not None and aggregate.count else None
+
+    def _decode_session_responses(self, session):
+        """Decrypt every stored response of a session into a typed frame"""
+        encryptor = self.session_encryptor(session)
+        responses = self.response_collection(session).find({'session_id': session['session_id']})
+        decrypted_data = [encryptor.decrypt_data(response['data']) for response in responses]
+        if not decrypted_data:
+            return None
+
+        # Decode straight into typed columns using the survey's field registry
+        original_df = compile_survey(self.survey_type).decode(decrypted_data)
+        return original_df.select_dtypes(include=[np.number])
+
+    def generate_synthetic_data_from_session(self, session):
+        """Generate synthetic data from a session before deletion and add it to the catalog.
+
+        Uses the session's aggregate when there is one: correlations come from
+        its cross products and marginals from its reservoir, so the cost does
+        not grow with the number of responses. Sessions without a usable
+        aggregate are rebuilt from their responses.
+        """
+        try:
+            session_id = session['session_id']
+            started = time.perf_counter()
+
+            aggregate = self.load_session_aggregate(session)
+            category_counts = None
+            if aggregate is not None:
+                source_df = aggregate.reservoir_frame()
+                bounds_df = aggregate.bounds_frame()
+                source_responses = aggregate.count
+                category_counts = aggregate.category_counts
+            else:
+                source_df = self._decode_session_responses(session)
+                if source_df is None:
+                    return None
+                bounds_df = source_df
+                source_responses = len(source_df)
+            decrypted = time.perf_counter()
+
+            if source_df.empty:
                 return None
-                
+
             # Generate synthetic data only if we have enough samples
-            if len(numerical_df) < 2:
+            if source_responses < 2:
                 st.warning("Not enough responses to generate meaningful synthetic data")
                 return None
-                
+
             # Get original correlations
-            original_correlations = self.get_significant_correlations(numerical_df)
-            
+            if aggregate is not None:
+                original_correlations = significant_correlations(aggregate.correlation_matrix())
+            else:
+                original_correlations = self.get_significant_correlations(source_df)
+
             # Generate synthetic data
-            synthetic_df = self.generate_base_synthetic_data(numerical_df)
-            
+            synthetic_df = self.generate_base_synthetic_data(source_df)
+
             # Adjust correlations
             final_synthetic_df = self.iterative_correlation_adjustment(synthetic_df, original_correlations)
-            
+
             # Ensure values are within bounds
-            final_synthetic_df = self.enforce_value_bounds(final_synthetic_df, numerical_df)
-            
-            # Save synthetic data as CSV
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            filename = f"synthetic_data_{session_id}_{timestamp}.csv"
-            final_synthetic_df.to_csv(filename, index=False)
+            final_synthetic_df = self.enforce_value_bounds(final_synthetic_df, bounds_df)
+            synthetic_correlations = self.get_significant_correlations(final_synthetic_df)
+            synthesized = time.perf_counter()
+
+            timings = {
+                'decrypt_seconds': round(decrypted - started, 4),
+                'synthesis_seconds': round(synthesized - decrypted, 4),
+                'source_responses': source_responses,
+                'from_aggregate': aggregate is not None
+            }
+
+            # Persist to the synthetic dataset catalog
+            dataset_id = self.catalog.save(
+                final_synthetic_df,
+                session_id,
+                original_correlations,
+                synthetic_correlations,
+                timings,
+                category_counts
+            )
             
             # Return both the DataFrame and metadata for display
             return {
+                'dataset_id': str(dataset_id),
                 'data': final_synthetic_df,
-                'filename': filename,
+                'filename': f"synthetic_data_{session_id}.csv",
                 'original_correlations': original_correlations,
-                'synthetic_correlations': self.get_significant_correlations(final_synthetic_df)
+                'synthetic_correlations': synthetic_correlations
             }
             
         except Exception as e:
             st.warning(f"Error generating synthetic data: {str(e)}")
             return None
+
+    def list_synthetic_datasets(self, limit=20, skip=0):
+        """List catalog metadata for generated synthetic datasets, newest first"""
+        try:
+            return self.catalog.list(limit=limit, skip=skip)
+        except Exception as e:
+            st.warning(f"Error listing synthetic datasets: {str(e)}")
+            return []
+
+    def count_synthetic_datasets(self):
+        """Number of synthetic datasets in the catalog for this survey"""
+        try:
+            return self.catalog.count()
+        except Exception as e:
+            st.warning(f"Error counting synthetic datasets: {str(e)}")
+            return 0
+
+    def get_synthetic_dataset(self, dataset_id):
+        """Full catalog metadata for one synthetic dataset"""
+        return self.catalog.get(dataset_id)
+
+    def load_synthetic_dataset(self, dataset_id):
+        """Load the rows of one synthetic dataset from the catalog"""
+        return self.catalog.load(dataset_id)
+
+    def export_synthetic_dataset(self, dataset_id, fmt, precision=None):
+        """Encode a catalog dataset for download in chunks (see utils.exports)"""
+        document = self.catalog.get(dataset_id)
+        if document is None:
+            raise KeyError(f"Unknown synthetic dataset: {dataset_id}")
+        return export_dataset(self.catalog.open_payload(document), fmt, precision)
+
+    def _delete_by_session_ids(self, collection, session_ids, extra_filter=None):
+        """Delete documents of the given sessions with batched $in filters in one bulk_write"""
+        if not session_ids:
+            return
+        operations = [
+            DeleteMany({'session_id': {'$in': session_ids[start:start + CLEANUP_BATCH_SIZE]}, **(extra_filter or {})})
+            for start in range(0, len(session_ids), CLEANUP_BATCH_SIZE)
+        ]
+        collection.bulk_write(operations, ordered=False)
+
+    def claim_expired_session(self, current_time):
+        """Atomically lease one expired session for this worker.
+
+        A session is claimable when nobody holds it or its lease has lapsed,
+        e.g. because the worker that took it crashed mid-synthesis.
+        """
+        now = datetime.utcnow()
+        return self.sessions.find_one_and_update(
+            claim_filter(current_time, now),
+            claim_update(now),
+            sort=[('expires_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
     def cleanup_expired_sessions(self):
-        """Remove expired sessions and their responses after generating synthetic data"""
+        """Remove expired sessions and their responses after generating synthetic data.
+
+        Expired sessions are leased one at a time (see claim_expired_session),
+        so concurrent app processes split the work instead of repeating it.
+        Every delete targets exactly the claimed set by id, so a session that
+        expires mid-cleanup is left for the next run instead of being deleted
+        unsynthesized.
+
+        Each call handles at most CLEANUP_MAX_SESSIONS sessions, oldest expiry
+        first, and stops claiming once CLEANUP_TIME_BUDGET_SECONDS have passed.
+        Progress and the remaining backlog are checkpointed (see
+        get_cleanup_status), so a large backlog drains over several calls.
+        """
         try:
-            current_time = datetime.utcnow()
-            
-            # Find expired sessions
-            expired_sessions = self.sessions.find({
-                'expires_at': {'$lte': current_time}
-            })
-            
-            synthetic_datasets = []
+            return self.run_cleanup_batch()[1]
+        except Exception as e:
+            st.warning(f"Error during cleanup: {str(e)}")
+            return []
+
+    def run_cleanup_batch(self):
+        """One bounded cleanup pass (see cleanup_expired_sessions) that raises on
+        failure; returns (sessions processed, synthetic datasets generated)"""
+        started = time.perf_counter()
+        current_time = datetime.utcnow()
+        
+        expired_sessions = []
+        synthetic_datasets = []
+        # Older sessions share the master key, so their responses must be
+        # deleted; sessions with their own data key are shredded by deleting
+        # the session document and their ciphertext is purged by TTL
+        legacy_session_ids = {}
+        
+        while (len(expired_sessions) < CLEANUP_MAX_SESSIONS
+               and time.perf_counter() - started < CLEANUP_TIME_BUDGET_SECONDS):
+            session = self.claim_expired_session(current_time)
+            if session is None:
+                break
+            expired_sessions.append(session)
             
-            for session in expired_sessions:
-                # Generate synthetic data before deletion
-                synthetic_data = self.generate_synthetic_data_from_session(session['session_id'])
+            # Generate synthetic data before deletion, unless a worker whose
+            # lease lapsed already got as far as saving it
+            if not self.catalog.has_session(session['session_id']):
+                synthetic_data = self.generate_synthetic_data_from_session(session)
                 if synthetic_data:
                     synthetic_datasets.append(synthetic_data)
-                
-                # Delete responses for this session
-                self.collection.delete_many({
-                    'session_id': session['session_id']
-                })
-            
-            # Delete expired sessions
-            self.sessions.delete_many({
-                'expires_at': {'$lte': current_time}
-            })
-            
-            return synthetic_datasets
             
+            if not session.get('wrapped_key'):
+                collection = self.response_collection(session)
+                legacy_session_ids.setdefault(collection.name, []).append(session['session_id'])
+        
+        session_ids = [session['session_id'] for session in expired_sessions]
+        for name, ids in legacy_session_ids.items():
+            self._delete_by_session_ids(self.db[name], ids)
+        self._delete_by_session_ids(self.aggregates, session_ids)
+        self._delete_by_session_ids(self.partials, session_ids)
+        
+        # Delete the claimed sessions, destroying their data keys; a session
+        # whose lease lapsed and was taken over is left to its new owner
+        self._delete_by_session_ids(self.sessions, session_ids, {'lease_owner': WORKER_ID})
+        self.drop_expired_buckets(current_time)
+        
+        self.checkpoint_cleanup(expired_sessions, current_time, time.perf_counter() - started)
+        return len(expired_sessions), synthetic_datasets
+
+    def checkpoint_cleanup(self, processed_sessions, current_time, seconds):
+        """Record a cleanup run's progress and the expired sessions still pending"""
+        pending = self.sessions.count_documents({'expires_at': {'$lte': current_time}})
+        update = {
+            '$set': {
+                'last_run_at': current_time,
+                'last_run_processed': len(processed_sessions),
+                'last_run_seconds': round(seconds, 4),
+                'pending': pending
+            },
+            '$inc': {'processed_total': len(processed_sessions)}
+        }
+        if processed_sessions:
+            update['$set']['last_expires_at'] = processed_sessions[-1]['expires_at']
+        self.checkpoints.update_one({'_id': 'cleanup'}, update, upsert=True)
+
+    def get_cleanup_status(self):
+        """Latest cleanup checkpoint, or None if cleanup has not run yet"""
+        return self.checkpoints.find_one({'_id': 'cleanup'})
+
+    def build_response_document(self, session, response_data, idempotency_key=None):
+        return response_document(self.session_encryptor(session), session, response_data, idempotency_key)
+
+    def fold_into_aggregate(self, session, responses):
+        """Update the aggregate, marking it stale if that fails; the responses
+        themselves are already stored, so synthesis can still rebuild from them"""
+        try:
+            self.update_session_aggregate(session, responses)
         except Exception as e:
-            st.warning(f"Error during cleanup: {str(e)}")
-            return []
+            self.aggregates.update_one({'session_id': session['session_id']}, stale_update(session), upsert=True)
+            st.warning(f"Session aggregate not updated: {str(e)}")
 
-    def store_response(self, response_data, session_id):
-        """Store encrypted response with session ID"""
+    def insert_idempotent(self, collection, documents):
+        """insert_many that skips documents whose idempotency key is already
+        stored; returns the indexes of the documents actually inserted"""
         try:
-            session = self.sessions.find_one({'session_id': session_id})
-            if not session:
-                raise Exception("Invalid session")
-                
-            encrypted_data = self.encryptor.encrypt_data(response_data)
+            collection.insert_many(documents, ordered=False)
+            return list(range(len(documents)))
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if any(error['code'] != 11000 for error in errors):
+                raise
+            duplicates = {error['index'] for error in errors}
+            return [index for index in range(len(documents)) if index not in duplicates]
+
+    def replay_responses(self, session_id, entries):
+        """Store journaled submissions of one session (see utils.journal).
+
+        Entries journaled after the session expired, or whose session is
+        already gone, are discarded. Replays are idempotent.
+        """
+        session = self.sessions.find_one({'session_id': session_id})
+        if not session:
+            return 0
+
+        entries = [entry for entry in entries if entry['journaled_at'] <= session['expires_at']]
+        if not entries:
+            return 0
+
+        documents = [
+            self.build_response_document(session, entry['response_data'], entry['idempotency_key'])
+            for entry in entries
+        ]
+        inserted = self.insert_idempotent(self.response_collection(session), documents)
+        if MAX_RESPONSES_PER_SESSION:
+            # Count what the slot reservations missed, and give back the slots of
+            # entries reserved before the outage that turned out to be duplicates
+            stored = set(inserted)
+            delta = sum((index in stored) - entry['counted'] for index, entry in enumerate(entries))
+            if delta:
+                self.sessions.update_one({'session_id': session_id}, {'$inc': {'response_count': delta}})
+        if inserted:
+            self.fold_into_aggregate(session, [entries[index]['response_data'] for index in inserted])
+        return len(inserted)
+
+    def store_response(self, response_data, session_id, idempotency_key=None):
+        """Store encrypted response with session ID.
+
+        With an idempotency key the insert is an upsert keyed on
+        (session_id, idempotency_key): a repeated submit matches the stored
+        document and is a no-op, leaving the aggregate untouched. Keys this
+        process has already stored return before admission control, so a
+        rerun never spends a rate-limit token.
+
+        Submissions pass admission control first (utils/admission.py) and,
+        with MAX_RESPONSES_PER_SESSION set, count against the session's cap.
+
+        If the database is unreachable the response goes to the local
+        encrypted journal instead and is replayed once it recovers.
+        """
+        admission = get_admission()
+        if idempotency_key and admission.seen(session_id, idempotency_key):
+            return None
+        
+        reserved = False
+        try:
+            with admission.admit(self.survey_type, session_id):
+                # Expired sessions are rejected so a late write cannot recreate a dropped bucket
+                session = self.reserve_response_slot(session_id)
+                reserved = True
+                result = self._store_response(session, response_data, idempotency_key)
+            if idempotency_key:
+                admission.remember(session_id, idempotency_key)
+            return result
             
-            document = {
-                'data': encrypted_data,
-                'session_id': session_id,
-                'created_at': datetime.utcnow(),
-                'expires_at': session['expires_at']
-            }
+        except SubmissionRejected:
+            raise
             
-            result = self.collection.insert_one(document)
-            return result
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            if not isinstance(self.client, StorageClient):
+                get_breaker(self.client).record_failure(e)
+            # A slot reserved before the outage stays counted; the replay must not count it again
+            idempotency_key = get_journal().append(
+                self.survey_type, session_id, response_data, idempotency_key,
+                counted=reserved and bool(MAX_RESPONSES_PER_SESSION)
+            )
+            admission.remember(session_id, idempotency_key)
+            st.info("The database is busy; your response was saved securely and will be stored shortly.")
             
         except Exception as e:
+            if reserved:
+                self.release_response_slot(session_id)
             st.error(f"Error storing data: {str(e)}")
             raise
 
+    def reserve_response_slot(self, session_id):
+        """Look up the session and count the response against its cap in one
+        atomic update; raises if the session expired or the cap is reached"""
+        now = datetime.utcnow()
+        if not MAX_RESPONSES_PER_SESSION:
+            session = self.sessions.find_one(response_slot_filter(session_id, now))
+        else:
+            session = self.sessions.find_one_and_update(
+                response_slot_filter(session_id, now),
+                {'$inc': {'response_count': 1}},
+                return_document=ReturnDocument.AFTER
+            )
+        if session:
+            return session
+        if MAX_RESPONSES_PER_SESSION and self.sessions.find_one({'session_id': session_id, 'expires_at': {'$gt': now}}):
+            raise SubmissionRejected("This survey link has reached its response limit.")
+        raise Exception("Invalid session")
+
+    def release_response_slot(self, session_id):
+        if MAX_RESPONSES_PER_SESSION:
+            self.sessions.update_one({'session_id': session_id}, {'$inc': {'response_count': -1}})
+
+    def _store_response(self, session, response_data, idempotency_key):
+        session_id = session['session_id']
+        document = self.build_response_document(session, response_data)
+        collection = self.response_collection(session)
+        if not idempotency_key:
+            result = collection.insert_one(document)
+            self.fold_into_aggregate(session, [response_data])
+            return result
+        
+        del document['session_id']
+        try:
+            result = collection.update_one(
+                {'session_id': session_id, 'idempotency_key': idempotency_key},
+                {'$setOnInsert': document},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # A concurrent duplicate won the upsert race
+            self.release_response_slot(session_id)
+            return None
+        
+        if result.upserted_id is None:
+            # Duplicate submit: it does not count against the cap
+            self.release_response_slot(session_id)
+        else:
+            self.fold_into_aggregate(session, [response_data])
+        return result
+
     def get_session_responses(self, session_id):
         """Get all responses for a session"""
         try:
-            responses = self.collection.find({
+            session = self.sessions.find_one({'session_id': session_id})
+            if not session:
+                return []
+            responses = self.response_collection(session).find({
                 'session_id': session_id,
                 'expires_at': {'$gt': datetime.utcnow()}
             })
@@ -280,9 +829,10 @@ class Database:
         """Get basic statistics about responses"""
         try:
             current_time = datetime.utcnow()
-            total_responses = self.collection.count_documents({
-                'expires_at': {'$gt': current_time}
-            })
+            total_responses = sum(
+                collection.count_documents({'expires_at': {'$gt': current_time}})
+                for collection in self.response_collections()
+            )
             
             return {
                 'total_responses': total_responses,
@@ -292,8 +842,11 @@ class Database:
             st.error(f"Error getting stats: {str(e)}")
             return {'total_responses': 0, 'last_updated': current_time}
 
-    def __del__(self):
-        try:
-            self.client.close()
-        except:
-            pass
\ No newline at end of file
+    def get_active_responses(self):
+        """Unexpired encrypted responses across all response collections, newest first"""
+        current_time = datetime.utcnow()
+        responses = []
+        for collection in self.response_collections():
+            responses.extend(collection.find({'expires_at': {'$gt': current_time}}))
+        responses.sort(key=lambda response: response['created_at'], reverse=True)
+        return responses
@@ -17,4 +17,12 @@ class Encryptor:
 
     def decrypt_data(self, encrypted_data):
         decrypted_data = self.fernet.decrypt(encrypted_data.encode())
-        return json.loads(decrypted_data.decode())
\ No newline at end of file
+        return json.loads(decrypted_data.decode())
+
+    def generate_data_key(self):
+        """Fresh data key, returned wrapped (encrypted) by this key"""
+        return self.fernet.encrypt(Fernet.generate_key()).decode()
+
+    def unwrap(self, wrapped_key):
+        """Encryptor for a data key that was wrapped by this key"""
+        return Encryptor(self.fernet.decrypt(wrapped_key.encode()))
\ No newline at end of file
@@ -0,0 +1,114 @@
+from datetime import datetime
+import heapq
+import logging
+import threading
+import time
+import streamlit as st
+from utils.database import Database
+from utils.config import (
+    EXPIRY_SCHEDULER_ENABLED, EXPIRY_SCHEDULER_RESYNC_SECONDS, EXPIRY_SCHEDULER_RETRY_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryScheduler:
+    """Background thread that runs cleanup as session deadlines pass.
+
+    Deadlines are loaded from the sessions collection once, kept in a
+    min-heap and extended by schedule() whenever this process creates a
+    link. The thread sleeps until the earliest deadline instead of polling.
+    Every EXPIRY_SCHEDULER_RESYNC_SECONDS it reloads upcoming deadlines to
+    pick up sessions created by other app processes.
+
+    Database errors (including an open circuit breaker) never end the
+    thread: it backs off, doubling the delay up to the resync interval,
+    then reconnects and reloads every deadline.
+    """
+
+    def __init__(self, survey_type):
+        self.survey_type = survey_type
+        self.heap = []
+        self.known = set()
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name=f"expiry-{survey_type}", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def schedule(self, session_id, expires_at):
+        """Add a session deadline, waking the thread if it is now the earliest"""
+        with self.condition:
+            if session_id in self.known:
+                return
+            self.known.add(session_id)
+            heapq.heappush(self.heap, (expires_at, session_id))
+            if self.heap[0][1] == session_id:
+                self.condition.notify()
+
+    def _load_deadlines(self, db):
+        for session in db.sessions.find({}, {'session_id': 1, 'expires_at': 1}):
+            self.schedule(session['session_id'], session['expires_at'])
+
+    def _next_wait(self):
+        """Seconds until the earliest deadline; None if nothing is scheduled"""
+        if not self.heap:
+            return None
+        return (self.heap[0][0] - datetime.utcnow()).total_seconds()
+
+    def _pop_due(self):
+        now = datetime.utcnow()
+        due = 0
+        while self.heap and self.heap[0][0] <= now:
+            _, session_id = heapq.heappop(self.heap)
+            self.known.discard(session_id)
+            due += 1
+        return due
+
+    def _run(self):
+        db = None
+        last_sync = None
+        failures = 0
+
+        while True:
+            try:
+                if db is None:
+                    db = Database(self.survey_type)
+                if last_sync is None or (datetime.utcnow() - last_sync).total_seconds() >= EXPIRY_SCHEDULER_RESYNC_SECONDS:
+                    # Also re-queues deadlines popped while the database was unreachable
+                    self._load_deadlines(db)
+                    last_sync = datetime.utcnow()
+                failures = 0
+
+                with self.condition:
+                    wait = self._next_wait()
+                    if wait is None or wait > 0:
+                        timeout = EXPIRY_SCHEDULER_RESYNC_SECONDS if wait is None else min(wait, EXPIRY_SCHEDULER_RESYNC_SECONDS)
+                        self.condition.wait(timeout=timeout)
+                    due = self._pop_due()
+
+                if not due:
+                    continue
+
+                # Cleanup works in bounded batches; keep going until a pass finds
+                # nothing to claim. A failing pass raises into the backoff below
+                while db.run_cleanup_batch()[0]:
+                    pass
+
+            except Exception:
+                failures += 1
+                delay = min(EXPIRY_SCHEDULER_RETRY_SECONDS * 2 ** (failures - 1), EXPIRY_SCHEDULER_RESYNC_SECONDS)
+                logger.warning("Expiry scheduler for %s failed; retrying in %.0fs",
+                               self.survey_type, delay, exc_info=True)
+                db = None
+                last_sync = None
+                time.sleep(delay)
+
+
+@st.cache_resource
+def get_expiry_scheduler(survey_type):
+    """The process-wide expiry scheduler for a survey, or None if disabled"""
+    if not EXPIRY_SCHEDULER_ENABLED:
+        return None
+    return ExpiryScheduler(survey_type).start()
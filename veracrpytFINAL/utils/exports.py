@@ -0,0 +1,66 @@
+import gzip
+import io
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from utils.config import EXPORT_BATCH_ROWS
+
+# Download formats offered for synthetic datasets
+EXPORT_FORMATS = {
+    'csv.gz': {'label': 'Gzip CSV', 'mime': 'application/gzip'},
+    'parquet': {'label': 'Parquet', 'mime': 'application/vnd.apache.parquet'},
+    'csv': {'label': 'CSV', 'mime': 'text/csv'}
+}
+
+
+def _round_batch(batch, precision):
+    """Round floating point columns to `precision` decimal places"""
+    if precision is None:
+        return batch
+    columns = [
+        pc.round(column, ndigits=precision) if pa.types.is_floating(column.type) else column
+        for column in batch.columns
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=batch.schema)
+
+
+def _write_csv(parquet_file, precision, out):
+    float_format = f"%.{precision}f" if precision is not None else None
+    for number, batch in enumerate(parquet_file.iter_batches(batch_size=EXPORT_BATCH_ROWS)):
+        chunk = batch.to_pandas().to_csv(index=False, header=number == 0, float_format=float_format)
+        out.write(chunk.encode('utf-8'))
+
+
+def _write_parquet(parquet_file, precision, out):
+    writer = pq.ParquetWriter(out, parquet_file.schema_arrow, compression='zstd')
+    try:
+        for batch in parquet_file.iter_batches(batch_size=EXPORT_BATCH_ROWS):
+            writer.write_batch(_round_batch(batch, precision))
+    finally:
+        writer.close()
+
+
+def export_dataset(parquet_file, fmt, precision=None):
+    """Encode a stored synthetic dataset for download, one row batch at a time.
+
+    Only one batch of rows is decoded at once; the output is compressed as it
+    is written, so peak memory is the compressed file plus a single batch.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    out = io.BytesIO()
+    if fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6) as gz:
+            _write_csv(parquet_file, precision, gz)
+    elif fmt == 'csv':
+        _write_csv(parquet_file, precision, out)
+    else:
+        _write_parquet(parquet_file, precision, out)
+    return out.getvalue()
+
+
+def export_filename(filename, fmt):
+    """Swap the stored payload's extension for the export format's"""
+    stem = filename.rsplit('.', 1)[0]
+    return f"{stem}.{fmt}"
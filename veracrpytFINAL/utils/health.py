@@ -0,0 +1,74 @@
+import threading
+import time
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+
+
+class CircuitOpenError(ConnectionFailure):
+    """Raised without touching the network while the breaker is open"""
+
+
+class CircuitBreaker:
+    """Process-wide health state for one database connection.
+
+    A successful ping is trusted for `cache_seconds`, so building several
+    Database objects per page render costs one ping at most. After
+    `failure_threshold` consecutive failures the breaker opens: callers fail
+    immediately and a single background thread probes every
+    `cooldown_seconds` until the database answers again.
+    """
+
+    def __init__(self, probe, failure_threshold, cooldown_seconds, cache_seconds):
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.cache_seconds = cache_seconds
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.open = False
+        self.last_success = None
+        self.last_error = None
+
+    def check(self):
+        """Fail fast while the breaker is open"""
+        if self.open:
+            raise CircuitOpenError(f"Database unavailable, retrying in the background: {self.last_error}")
+
+    def ensure_healthy(self):
+        """Raise unless the database is known to be reachable, pinging at most once per cache window"""
+        self.check()
+        if self.last_success is not None and time.monotonic() - self.last_success < self.cache_seconds:
+            return
+        try:
+            self.probe()
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.open = False
+            self.last_success = time.monotonic()
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self.last_success = None
+            if self.open or self.failures < self.failure_threshold:
+                return
+            self.open = True
+        threading.Thread(target=self._probe_until_healthy, name="database-probe", daemon=True).start()
+
+    def _probe_until_healthy(self):
+        while True:
+            time.sleep(self.cooldown_seconds)
+            try:
+                self.probe()
+            except Exception as e:
+                with self.lock:
+                    self.last_error = str(e)
+                continue
+            self.record_success()
+            return
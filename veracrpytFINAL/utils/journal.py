@@ -0,0 +1,201 @@
+from datetime import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from utils.encryption import Encryptor
+from utils.admission import get_admission
+from utils.config import (
+    JOURNAL_PATH, JOURNAL_REPLAY_SECONDS, JOURNAL_REPLAY_BATCH, get_survey_config
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionJournal:
+    """Encrypted append-only journal of submissions the database could not take.
+
+    Entries live in a local SQLite file (WAL, synchronous=FULL), encrypted with
+    the survey's master key, each under an idempotency key so a replay that is
+    interrupted and repeated never stores a response twice. Entries that can
+    no longer be decrypted are moved to a quarantine table instead.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.lock = threading.Lock()
+        self.encryptors = {}
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=FULL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS submissions ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, survey_type TEXT NOT NULL, session_id TEXT NOT NULL, '
+            'idempotency_key TEXT NOT NULL, payload TEXT NOT NULL, journaled_at TEXT NOT NULL, '
+            'counted INTEGER NOT NULL DEFAULT 0)'
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS quarantine ('
+            'id INTEGER PRIMARY KEY, survey_type TEXT NOT NULL, session_id TEXT NOT NULL, '
+            'idempotency_key TEXT NOT NULL, payload TEXT NOT NULL, journaled_at TEXT NOT NULL, '
+            'counted INTEGER NOT NULL, error TEXT NOT NULL, quarantined_at TEXT NOT NULL)'
+        )
+        self.connection.commit()
+
+    def encryptor(self, survey_type):
+        if survey_type not in self.encryptors:
+            self.encryptors[survey_type] = Encryptor(get_survey_config(survey_type)['ENCRYPTION_KEY'])
+        return self.encryptors[survey_type]
+
+    def append(self, survey_type, session_id, response_data, idempotency_key=None, counted=False):
+        """Durably record a submission; returns its idempotency key.
+
+        `counted` marks a submission whose slot under MAX_RESPONSES_PER_SESSION
+        was already reserved before the database became unreachable.
+        """
+        idempotency_key = idempotency_key or uuid.uuid4().hex
+        payload = self.encryptor(survey_type).encrypt_data(response_data)
+        with self.lock:
+            self.connection.execute(
+                'INSERT INTO submissions (survey_type, session_id, idempotency_key, payload, journaled_at, counted) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (survey_type, session_id, idempotency_key, payload, datetime.utcnow().isoformat(), int(counted))
+            )
+            self.connection.commit()
+        return idempotency_key
+
+    def pending(self):
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
+
+    def read_batch(self, limit=JOURNAL_REPLAY_BATCH):
+        """Oldest entries first, decrypted. Rows that fail to decrypt (a rotated
+        ENCRYPTION_KEY, or a survey type no longer in the registry) are
+        quarantined and left out."""
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT id, survey_type, session_id, idempotency_key, payload, journaled_at, counted '
+                'FROM submissions ORDER BY id LIMIT ?', (limit,)
+            ).fetchall()
+
+        entries = []
+        for row_id, survey_type, session_id, idempotency_key, payload, journaled_at, counted in rows:
+            try:
+                response_data = self.encryptor(survey_type).decrypt_data(payload)
+            except Exception as e:
+                self.quarantine(row_id, e)
+                continue
+            entries.append({
+                'id': row_id,
+                'survey_type': survey_type,
+                'session_id': session_id,
+                'idempotency_key': idempotency_key,
+                'response_data': response_data,
+                'journaled_at': datetime.fromisoformat(journaled_at),
+                'counted': bool(counted)
+            })
+        return entries
+
+    def quarantine(self, row_id, error):
+        """Move an entry that cannot be replayed out of the submissions table"""
+        logger.warning("Journal entry %s quarantined: %s", row_id, type(error).__name__)
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO quarantine '
+                'SELECT id, survey_type, session_id, idempotency_key, payload, journaled_at, counted, ?, ? '
+                'FROM submissions WHERE id = ?',
+                (type(error).__name__, datetime.utcnow().isoformat(), row_id)
+            )
+            self.connection.execute('DELETE FROM submissions WHERE id = ?', (row_id,))
+            self.connection.commit()
+
+    def remove(self, ids):
+        with self.lock:
+            self.connection.executemany('DELETE FROM submissions WHERE id = ?', [(row_id,) for row_id in ids])
+            self.connection.commit()
+
+
+class JournalSink:
+    """Stands in for Database on the respondent form while the database is unreachable.
+
+    Sessions cannot be checked until replay, so the admission token buckets
+    are what bound the journal's growth from unknown `?session=` values.
+    """
+
+    def __init__(self, survey_type, journal):
+        self.survey_type = survey_type
+        self.journal = journal
+
+    def store_response(self, response_data, session_id, idempotency_key=None):
+        admission = get_admission()
+        if idempotency_key and admission.seen(session_id, idempotency_key):
+            return idempotency_key
+        admission.check(self.survey_type, session_id)
+        idempotency_key = self.journal.append(self.survey_type, session_id, response_data, idempotency_key)
+        admission.remember(session_id, idempotency_key)
+        return idempotency_key
+
+
+class JournalReplayer:
+    """Background thread draining the journal into the database once it is reachable"""
+
+    def __init__(self, journal, interval=JOURNAL_REPLAY_SECONDS):
+        self.journal = journal
+        self.interval = interval
+        self.thread = threading.Thread(target=self._run, name="journal-replayer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def replay_once(self):
+        """Replay one batch; returns the number of entries taken off the journal"""
+        # Imported here: Database falls back to the journal, so it imports this module
+        from utils.database import Database
+
+        entries = self.journal.read_batch()
+        groups = {}
+        for entry in entries:
+            groups.setdefault((entry['survey_type'], entry['session_id']), []).append(entry)
+
+        done = []
+        databases = {}
+        for (survey_type, session_id), group in groups.items():
+            if survey_type not in databases:
+                databases[survey_type] = Database(survey_type)
+            databases[survey_type].replay_responses(session_id, group)
+            done.extend(entry['id'] for entry in group)
+        self.journal.remove(done)
+        return len(done)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                while self.journal.pending() and self.replay_once():
+                    pass
+            except Exception as e:
+                # Typically the circuit breaker still being open; try again later
+                logger.warning("Journal replay deferred: %s", e)
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """The process-wide journal, with its replayer started on first use"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = SubmissionJournal()
+            JournalReplayer(_journal).start()
+        return _journal
+
+
+def resume_journal():
+    """Open the journal, starting its replayer, if an earlier run left one on disk"""
+    if os.path.exists(JOURNAL_PATH):
+        return get_journal()
+    return None
@@ -0,0 +1,125 @@
+import math
+from utils.config import PROMPT_TOKEN_BUDGET, PROMPT_MAX_CORRELATIONS
+
+# Rough English/number average for GPT tokenizers; avoids a tokenizer dependency
+CHARS_PER_TOKEN = 4
+
+SUMMARY_STATS = ('mean', 'std', 'min', 'max')
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _fmt(value):
+    return f"{value:.3g}"
+
+
+def rank_correlations(pairs, limit=None):
+    """Correlation pairs sorted by strength, strongest first"""
+    ranked = sorted(pairs.items(), key=lambda item: abs(item[1]), reverse=True)
+    return ranked[:limit] if limit is not None else ranked
+
+
+def column_table(describe, columns):
+    """Compact one-line-per-column summary in place of describe().to_string()"""
+    lines = ["column | " + " | ".join(SUMMARY_STATS)]
+    for col in columns:
+        stats = describe[col]
+        lines.append(f"{col} | " + " | ".join(_fmt(stats[stat]) for stat in SUMMARY_STATS))
+    return "\n".join(lines)
+
+
+def _correlation_lines(ranked):
+    if not ranked:
+        return "- none above threshold"
+    return "\n".join(f"- {pair}: {corr}" for pair, corr in ranked)
+
+
+def _render(shape, columns, describe, ranked, part=None):
+    header = "Synthetic Dataset Summary"
+    if part is not None:
+        header += f" (part {part[0]} of {part[1]}, columns {columns[0]} to {columns[-1]})"
+    return (
+        f"{header}:\n"
+        f"- Shape: {shape}\n"
+        f"- Columns in this summary: {len(columns)}\n\n"
+        f"Column Statistics:\n{column_table(describe, columns)}\n\n"
+        f"Key Correlations (strongest first):\n{_correlation_lines(ranked)}\n"
+    )
+
+
+def _fit_correlations(shape, columns, describe, ranked, token_budget, part=None):
+    """Render with as many of the strongest correlations as fit the budget"""
+    low, high = 0, len(ranked)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(_render(shape, columns, describe, ranked[:mid], part)) <= token_budget:
+            low = mid
+        else:
+            high = mid - 1
+    return _render(shape, columns, describe, ranked[:low], part)
+
+
+def _split_columns(describe, columns, token_budget):
+    """Greedily pack columns into chunks whose tables use at most half the budget"""
+    table_budget = token_budget // 2
+    chunks, current = [], []
+    for col in columns:
+        if current and estimate_tokens(column_table(describe, current + [col])) > table_budget:
+            chunks.append(current)
+            current = []
+        current.append(col)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_analysis_prompts(analytics, token_budget=PROMPT_TOKEN_BUDGET, max_correlations=PROMPT_MAX_CORRELATIONS):
+    """Build one or more dataset descriptions that each fit within token_budget.
+
+    Narrow datasets produce a single description. Wide datasets are split
+    into column chunks, each carrying the strongest correlations that involve
+    its columns; their summaries are merged with build_merge_prompt.
+    """
+    shape = analytics['shape']
+    columns = analytics['numeric_columns']
+    describe = analytics['describe']
+    ranked = rank_correlations(analytics['significant_correlations'], max_correlations)
+
+    prompt = _render(shape, columns, describe, ranked)
+    if estimate_tokens(prompt) <= token_budget:
+        return [prompt]
+
+    if estimate_tokens(_render(shape, columns, describe, [])) <= token_budget:
+        return [_fit_correlations(shape, columns, describe, ranked, token_budget)]
+
+    chunks = _split_columns(describe, columns, token_budget)
+    all_ranked = rank_correlations(analytics['significant_correlations'])
+    prompts = []
+    for number, chunk in enumerate(chunks, 1):
+        chunk_cols = set(chunk)
+        chunk_ranked = [
+            (pair, corr) for pair, corr in all_ranked
+            if any(col in chunk_cols for col in pair.split(" and "))
+        ][:max_correlations]
+        prompts.append(_fit_correlations(shape, chunk, describe, chunk_ranked, token_budget,
+                                         part=(number, len(chunks))))
+    return prompts
+
+
+def build_merge_prompt(summaries, token_budget=PROMPT_TOKEN_BUDGET):
+    """Combine per-chunk analyses into one request, trimming each to fit the budget"""
+    header = (
+        "The following are analyses of different column groups of one synthetic dataset. "
+        "Merge them into a single set of insights, removing repetition.\n\n"
+    )
+    per_summary = max((token_budget - estimate_tokens(header)) // max(len(summaries), 1), 1)
+    max_chars = per_summary * CHARS_PER_TOKEN - 20
+
+    parts = []
+    for number, summary in enumerate(summaries, 1):
+        if len(summary) > max_chars:
+            summary = summary[:max(max_chars, 0)].rstrip() + " ..."
+        parts.append(f"Part {number}:\n{summary}")
+    return header + "\n\n".join(parts)
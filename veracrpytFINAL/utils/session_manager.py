@@ -2,7 +2,8 @@ from datetime import datetime, timedelta
 import secrets
 import streamlit as st
 from utils.database import Database
-from utils.config import get_survey_config
+from utils.config import MAX_BULK_LINKS, get_survey_config
+from utils.expiry_scheduler import get_expiry_scheduler
 
 class SessionManager:
     def __init__(self, session_duration, survey_type='mental_health'):
@@ -11,26 +12,56 @@ class SessionManager:
         self.config = get_survey_config(survey_type)
         self.db = Database(survey_type)
     
-    def generate_session_link(self):
-        """Generate a unique session link valid for the configured duration"""
-        session_id = secrets.token_urlsafe(16)
-        expiry_time = datetime.utcnow() + timedelta(minutes=self.session_duration)
-        
-        # Store session information
-        session_data = {
-            'session_id': session_id,
+    def _session_document(self, expiry_time):
+        return {
+            'session_id': secrets.token_urlsafe(16),
             'created_at': datetime.utcnow(),
             'expires_at': expiry_time,
             'is_active': True,
-            'survey_type': self.survey_type
+            'survey_type': self.survey_type,
+            # Per-session data key; deleting the session document shreds its responses
+            'wrapped_key': self.db.encryptor.generate_data_key()
         }
-        
-        self.db.sessions.insert_one(session_data)
+
+    def _publish(self, sessions):
+        """Schedule the sessions' deadlines and build their links"""
+        # Let this process's expiry scheduler know about the new deadlines
+        scheduler = get_expiry_scheduler(self.survey_type)
+        if scheduler:
+            for session in sessions:
+                scheduler.schedule(session['session_id'], session['expires_at'])
         
         # Generate the complete link using BASE_URL from config
-        link = f"{self.config['BASE_URL']}?session={session_id}"
+        return [
+            (f"{self.config['BASE_URL']}?session={session['session_id']}", session['expires_at'])
+            for session in sessions
+        ]
+
+    def generate_session_link(self):
+        """Generate a unique session link valid for the configured duration"""
+        expiry_time = datetime.utcnow() + timedelta(minutes=self.session_duration)
+        session_data = self._session_document(expiry_time)
+        self.db.sessions.insert_one(session_data)
+        return self._publish([session_data])[0]
+
+    def generate_session_links(self, count, stagger_seconds=0):
+        """Generate `count` links with a single insert_many.
+
+        Expiries are spread evenly over `stagger_seconds` after the configured
+        duration, so a campaign's sessions do not all reach cleanup at once.
+        Returns a list of (link, expiry_time) tuples.
+        """
+        if not 1 <= count <= MAX_BULK_LINKS:
+            raise ValueError(f"Between 1 and {MAX_BULK_LINKS} links can be generated at once")
         
-        return link, expiry_time
+        base_expiry = datetime.utcnow() + timedelta(minutes=self.session_duration)
+        step = stagger_seconds / (count - 1) if count > 1 else 0
+        sessions = [
+            self._session_document(base_expiry + timedelta(seconds=index * step))
+            for index in range(count)
+        ]
+        self.db.sessions.insert_many(sessions, ordered=False)
+        return self._publish(sessions)
 
     def validate_session(self, session_id):
         """Check if a session is still valid"""
@@ -0,0 +1,149 @@
+import random
+import numpy as np
+import pandas as pd
+from utils.config import AGGREGATE_RESERVOIR_SIZE
+
+
+class SessionAggregate:
+    """Sufficient statistics of one session's responses.
+
+    Holds the response count, per-column sums, minima and maxima, the
+    cross-product matrix, a bounded uniform reservoir of rows and category
+    counts. Means, covariances and correlations follow from these in O(p²),
+    and the reservoir stands in for the marginal distributions, so synthesis
+    never has to revisit individual responses.
+    """
+
+    def __init__(self, columns, categories, reservoir_size=AGGREGATE_RESERVOIR_SIZE):
+        p = len(columns)
+        self.columns = list(columns)
+        self.count = 0
+        self.incomplete = 0
+        self.sums = [0.0] * p
+        self.mins = [None] * p
+        self.maxs = [None] * p
+        self.cross_products = [[0.0] * p for _ in range(p)]
+        self.reservoir_size = reservoir_size
+        self.reservoir = []
+        self.category_counts = {
+            name: {option: 0 for option in options}
+            for name, options in categories.items()
+        }
+
+    @classmethod
+    def for_survey(cls, survey):
+        """Empty aggregate over a compiled survey's fields"""
+        return cls(
+            survey.numeric_fields,
+            {name: list(dtype.categories) for name, dtype in survey.categories.items()}
+        )
+
+    def add(self, response):
+        """Fold one response into the statistics"""
+        for name, counts in self.category_counts.items():
+            value = response.get(name)
+            if value in counts:
+                counts[value] += 1
+
+        values = [response.get(name) for name in self.columns]
+        if any(value is None for value in values):
+            self.incomplete += 1
+            return
+        values = [float(value) for value in values]
+
+        self.count += 1
+        for i, x in enumerate(values):
+            self.sums[i] += x
+            self.mins[i] = x if self.mins[i] is None else min(self.mins[i], x)
+            self.maxs[i] = x if self.maxs[i] is None else max(self.maxs[i], x)
+            row = self.cross_products[i]
+            for j in range(i, len(values)):
+                row[j] += x * values[j]
+
+        # Algorithm R: every complete response is kept with equal probability
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(values)
+        else:
+            slot = random.randrange(self.count)
+            if slot < self.reservoir_size:
+                self.reservoir[slot] = values
+
+    def merge(self, other):
+        """Fold another aggregate over the same fields into this one"""
+        for name, counts in other.category_counts.items():
+            mine = self.category_counts.setdefault(name, {})
+            for option, count in counts.items():
+                mine[option] = mine.get(option, 0) + count
+
+        # The merged reservoir draws from each side in proportion to the rows it stands for
+        left, right = list(self.reservoir), list(other.reservoir)
+        random.shuffle(left)
+        random.shuffle(right)
+        n_left, n_right = self.count, other.count
+        reservoir = []
+        while len(reservoir) < self.reservoir_size and n_left + n_right:
+            if random.randrange(n_left + n_right) < n_left:
+                reservoir.append(left.pop())
+                n_left -= 1
+            else:
+                reservoir.append(right.pop())
+                n_right -= 1
+        self.reservoir = reservoir
+
+        self.count += other.count
+        self.incomplete += other.incomplete
+        for i in range(len(self.columns)):
+            self.sums[i] += other.sums[i]
+            mins = [x for x in (self.mins[i], other.mins[i]) if x is not None]
+            maxs = [x for x in (self.maxs[i], other.maxs[i]) if x is not None]
+            self.mins[i] = min(mins) if mins else None
+            self.maxs[i] = max(maxs) if maxs else None
+            for j in range(i, len(self.columns)):
+                self.cross_products[i][j] += other.cross_products[i][j]
+
+    def mean(self):
+        return np.array(self.sums) / self.count
+
+    def covariance(self):
+        """Sample covariance matrix from the sums and cross products"""
+        upper = np.triu(np.array(self.cross_products))
+        products = upper + upper.T - np.diag(np.diag(upper))
+        mean = self.mean()
+        return (products - self.count * np.outer(mean, mean)) / (self.count - 1)
+
+    def correlation_matrix(self):
+        """Pearson correlations over every complete response in the session"""
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def reservoir_frame(self):
+        return pd.DataFrame(self.reservoir, columns=self.columns, dtype=np.float64)
+
+    def bounds_frame(self):
+        """Observed minima and maxima as a two-row frame"""
+        return pd.DataFrame([self.mins, self.maxs], columns=self.columns, dtype=np.float64)
+
+    def to_dict(self):
+        return {
+            'columns': self.columns,
+            'count': self.count,
+            'incomplete': self.incomplete,
+            'sums': self.sums,
+            'mins': self.mins,
+            'maxs': self.maxs,
+            'cross_products': self.cross_products,
+            'reservoir_size': self.reservoir_size,
+            'reservoir': self.reservoir,
+            'category_counts': self.category_counts
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregate = cls(data['columns'], {}, data['reservoir_size'])
+        for key in ('count', 'incomplete', 'sums', 'mins', 'maxs', 'cross_products',
+                    'reservoir', 'category_counts'):
+            setattr(aggregate, key, data[key])
+        return aggregate
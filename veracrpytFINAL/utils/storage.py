@@ -0,0 +1,653 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import copy
+import itertools
+import re
+import sqlite3
+import threading
+import time
+from bson import ObjectId, json_util
+from pymongo import MongoClient, ReturnDocument, DeleteMany, DeleteOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from utils.health import CircuitBreaker
+from utils.config import (
+    MONGO_URI, MONGO_OPTIONS, STORAGE_BACKEND, SQLITE_PATH,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS, HEALTH_CACHE_SECONDS
+)
+
+# Storage backends behind Database: 'mongo' (MongoClient), or the 'sqlite' and
+# 'memory' stand-ins below. The stand-ins implement the subset of the pymongo
+# collection API this app uses (filters with $gt/$gte/$lt/$lte/$ne/$in/$nin/
+# $exists/$regex/$or, $set/$inc/$unset/$setOnInsert updates, sort/skip/limit,
+# unique and TTL indexes), so responses, sessions, aggregates, counters and
+# the synthetic catalog all run unchanged without a MongoDB server.
+
+
+def connect(backend=STORAGE_BACKEND):
+    """Client for the configured storage backend; MongoClient is pooled and
+    thread-safe, so one instance is shared by the whole process"""
+    if backend == 'mongo':
+        return _shared_store('mongo', lambda: MongoClient(MONGO_URI, **MONGO_OPTIONS))
+    if backend == 'memory':
+        return StorageClient(_shared_store('memory', MemoryStore))
+    if backend == 'sqlite':
+        return StorageClient(_shared_store(SQLITE_PATH, lambda: SQLiteStore(SQLITE_PATH)))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _shared_store(key, factory):
+    # One store per process, so every Database instance sees the same data
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = factory()
+        return _stores[key]
+
+
+def get_breaker(client):
+    """The process-wide circuit breaker guarding a MongoClient"""
+    return _shared_store(
+        ('breaker', id(client)),
+        lambda: CircuitBreaker(
+            lambda: client.admin.command('ping'),
+            BREAKER_FAILURE_THRESHOLD,
+            BREAKER_COOLDOWN_SECONDS,
+            HEALTH_CACHE_SECONDS
+        )
+    )
+
+
+def ensure_available(client):
+    """Raise ConnectionFailure unless the backend is reachable; fails fast while
+    the Mongo breaker is open. The local stand-ins are always available."""
+    if isinstance(client, StorageClient):
+        return
+    get_breaker(client).ensure_healthy()
+
+
+# Naive UTC datetimes in and out, like the MongoClient defaults
+JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS.with_options(tz_aware=False)
+
+
+def _key(document_id):
+    return json_util.dumps(document_id, json_options=JSON_OPTIONS)
+
+
+# ---------------------------------------------------------------------------
+# Query evaluation
+
+def _compare(op):
+    def check(present, value, arg):
+        if value is None:
+            return False
+        try:
+            return op(value, arg)
+        except TypeError:
+            return False
+    return check
+
+
+OPERATORS = {
+    '$gt': _compare(lambda value, arg: value > arg),
+    '$gte': _compare(lambda value, arg: value >= arg),
+    '$lt': _compare(lambda value, arg: value < arg),
+    '$lte': _compare(lambda value, arg: value <= arg),
+    '$ne': lambda present, value, arg: value != arg,
+    '$in': lambda present, value, arg: value in arg,
+    '$nin': lambda present, value, arg: value not in arg,
+    '$exists': lambda present, value, arg: present == bool(arg),
+    '$regex': lambda present, value, arg: isinstance(value, str) and re.search(arg, value) is not None
+}
+
+
+def matches(document, query):
+    for key, condition in query.items():
+        if key == '$or':
+            if not any(matches(document, clause) for clause in condition):
+                return False
+            continue
+        if key == '$and':
+            if not all(matches(document, clause) for clause in condition):
+                return False
+            continue
+
+        present = key in document
+        value = document.get(key)
+        if isinstance(condition, dict) and condition and all(op.startswith('$') for op in condition):
+            for op, arg in condition.items():
+                if op not in OPERATORS:
+                    raise ValueError(f"Unsupported query operator: {op}")
+                if not OPERATORS[op](present, value, arg):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def apply_update(document, update, inserting=False):
+    for op, fields in update.items():
+        if op == '$set':
+            document.update(fields)
+        elif op == '$inc':
+            for field, amount in fields.items():
+                document[field] = document.get(field, 0) + amount
+        elif op == '$unset':
+            for field in fields:
+                document.pop(field, None)
+        elif op == '$setOnInsert':
+            if inserting:
+                document.update(fields)
+        else:
+            raise ValueError(f"Unsupported update operator: {op}")
+
+
+def project(document, projection):
+    if not projection:
+        return document
+    included = {field for field, flag in projection.items() if flag}
+    if included:
+        result = {field: document[field] for field in included if field in document}
+        if projection.get('_id', 1) and '_id' in document:
+            result['_id'] = document['_id']
+        return result
+    return {field: value for field, value in document.items() if field not in projection}
+
+
+def _sort_spec(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return list(key_or_list)
+
+
+def sort_documents(documents, spec):
+    # Stable sorts applied from the last key to the first; missing values sort first
+    for field, direction in reversed(spec):
+        documents.sort(
+            key=lambda document: (document.get(field) is not None, document.get(field)),
+            reverse=direction < 0
+        )
+    return documents
+
+
+# ---------------------------------------------------------------------------
+# Result objects mirroring pymongo's
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class BulkWriteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+# ---------------------------------------------------------------------------
+# Row stores: a transaction yields a table handle whose candidates(query)
+# returns fresh copies of every document that may match (a superset the
+# caller filters with matches()), plus get/put/delete/expire by key
+
+class MemoryStore:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.collections = {}
+        self.indexes = {}
+
+    @contextmanager
+    def transaction(self, name, write=False):
+        with self.lock:
+            yield MemoryTable(self.collections.setdefault(name, {}))
+
+    def names(self):
+        with self.lock:
+            return [name for name, rows in self.collections.items() if rows]
+
+    def drop(self, name):
+        with self.lock:
+            self.collections.pop(name, None)
+
+
+class MemoryTable:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def candidates(self, query):
+        return [(key, copy.deepcopy(document)) for key, document in list(self.rows.items())
+                if matches(document, query)]
+
+    def get(self, key):
+        return copy.deepcopy(self.rows.get(key))
+
+    def put(self, key, document):
+        self.rows[key] = document
+
+    def delete(self, key):
+        del self.rows[key]
+
+    def expire(self, field, cutoff):
+        for key in [key for key, document in self.rows.items()
+                    if isinstance(document.get(field), datetime) and document[field] <= cutoff]:
+            del self.rows[key]
+
+
+# Fields copied into real columns, so filters on them run as indexed SQL
+INDEXED_COLUMNS = {
+    'session_id': str,
+    'idempotency_key': str,
+    'expires_at': datetime,
+    'purge_at': datetime
+}
+
+SQL_COMPARISONS = {'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}
+
+
+def _column_value(field, value):
+    """Column form of a value, or None if it cannot be compared in SQL"""
+    kind = INDEXED_COLUMNS[field]
+    if kind is datetime:
+        if isinstance(value, datetime) and value.tzinfo is None:
+            # Fixed width, so string order is time order
+            return value.strftime('%Y-%m-%dT%H:%M:%S.%f')
+        return None
+    return value if isinstance(value, kind) else None
+
+
+def _stored_value(value):
+    # The JSON body keeps datetimes to the millisecond, like BSON; the column must agree
+    if isinstance(value, datetime):
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+
+def _sql_filter(query):
+    """WHERE clauses for the parts of a query on _id and the indexed columns.
+
+    Only conditions SQL evaluates exactly like matches() are pushed down;
+    everything else is left to the Python filter, so the rows selected are
+    always a superset of the matches.
+    """
+    clauses, params = [], []
+    for field, condition in query.items():
+        if field == '$and':
+            for clause in condition:
+                more_clauses, more_params = _sql_filter(clause)
+                clauses += more_clauses
+                params += more_params
+            continue
+        if field == '_id':
+            # The primary key column holds _key(_id); only exact-typed ids map one to one
+            if isinstance(condition, dict) and list(condition) == ['$in'] and condition['$in'] \
+                    and all(isinstance(value, (ObjectId, str)) for value in condition['$in']):
+                clauses.append(f"id IN ({', '.join('?' * len(condition['$in']))})")
+                params += [_key(value) for value in condition['$in']]
+            elif isinstance(condition, (ObjectId, str)):
+                clauses.append("id = ?")
+                params.append(_key(condition))
+            continue
+        if field not in INDEXED_COLUMNS:
+            continue
+
+        if isinstance(condition, dict) and condition and all(op.startswith('$') for op in condition):
+            for op, arg in condition.items():
+                if op in SQL_COMPARISONS and _column_value(field, arg) is not None:
+                    clauses.append(f"{field} {SQL_COMPARISONS[op]} ?")
+                    params.append(_column_value(field, arg))
+                elif op == '$in' and arg and all(_column_value(field, value) is not None for value in arg):
+                    clauses.append(f"{field} IN ({', '.join('?' * len(arg))})")
+                    params += [_column_value(field, value) for value in arg]
+        elif _column_value(field, condition) is not None:
+            clauses.append(f"{field} = ?")
+            params.append(_column_value(field, condition))
+    return clauses, params
+
+
+class SQLiteStore:
+    """Documents as BSON-extended JSON rows in one SQLite file in WAL mode.
+
+    The fields in INDEXED_COLUMNS are also stored as indexed columns, so
+    lookups by session, idempotency key or expiry select only the matching
+    rows. Reads run in deferred transactions and do not wait on writers;
+    writes take BEGIN IMMEDIATE, so read-modify-write operations
+    (find_one_and_update, conditional updates) stay atomic across processes
+    sharing the file. Each thread uses its own connection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.indexes = {}
+        self.local = threading.local()
+
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS documents ('
+            'collection TEXT NOT NULL, id TEXT NOT NULL, body TEXT NOT NULL, '
+            + ''.join(f'{field} TEXT, ' for field in INDEXED_COLUMNS)
+            + 'PRIMARY KEY (collection, id))'
+        )
+        for field in INDEXED_COLUMNS:
+            connection.execute(f'CREATE INDEX IF NOT EXISTS documents_{field} ON documents (collection, {field})')
+
+    def _connection(self):
+        if not hasattr(self.local, 'connection'):
+            connection = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return self.local.connection
+
+    @contextmanager
+    def transaction(self, name, write=False):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE' if write else 'BEGIN')
+        try:
+            yield SQLiteTable(connection, name)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def names(self):
+        return [row[0] for row in self._connection().execute('SELECT DISTINCT collection FROM documents')]
+
+    def drop(self, name):
+        self._connection().execute('DELETE FROM documents WHERE collection = ?', (name,))
+
+
+class SQLiteTable:
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+
+    def candidates(self, query):
+        clauses, params = _sql_filter(query)
+        rows = self.connection.execute(
+            'SELECT id, body FROM documents WHERE collection = ?' + ''.join(f' AND {clause}' for clause in clauses),
+            [self.name] + params
+        ).fetchall()
+        # Decoded lazily, so find_one stops at the first match
+        return ((key, json_util.loads(body, json_options=JSON_OPTIONS)) for key, body in rows)
+
+    def get(self, key):
+        row = self.connection.execute(
+            'SELECT body FROM documents WHERE collection = ? AND id = ?', (self.name, key)
+        ).fetchone()
+        return json_util.loads(row[0], json_options=JSON_OPTIONS) if row else None
+
+    def put(self, key, document):
+        columns = ', '.join(INDEXED_COLUMNS)
+        self.connection.execute(
+            f'INSERT OR REPLACE INTO documents (collection, id, body, {columns}) '
+            f'VALUES (?, ?, ?, {", ".join("?" * len(INDEXED_COLUMNS))})',
+            [self.name, key, json_util.dumps(document, json_options=JSON_OPTIONS)]
+            + [_column_value(field, _stored_value(document.get(field))) for field in INDEXED_COLUMNS]
+        )
+
+    def delete(self, key):
+        self.connection.execute('DELETE FROM documents WHERE collection = ? AND id = ?', (self.name, key))
+
+    def expire(self, field, cutoff):
+        if field in INDEXED_COLUMNS:
+            self.connection.execute(
+                f'DELETE FROM documents WHERE collection = ? AND {field} <= ?',
+                (self.name, _column_value(field, cutoff))
+            )
+            return
+        for key, document in self.candidates({}):
+            if isinstance(document.get(field), datetime) and document[field] <= cutoff:
+                self.delete(key)
+
+
+# ---------------------------------------------------------------------------
+# pymongo-shaped client, database, collection and cursor
+
+class StorageClient:
+    def __init__(self, store):
+        self.store = store
+        self.admin = self
+
+    def command(self, name):
+        return {'ok': 1}
+
+    def __getitem__(self, name):
+        return StorageDatabase(self.store, name)
+
+    def close(self):
+        pass
+
+
+class StorageDatabase:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def __getitem__(self, name):
+        return StorageCollection(self.store, self.name, name)
+
+    def list_collection_names(self, filter=None):
+        prefix = f"{self.name}."
+        names = [name[len(prefix):] for name in self.store.names() if name.startswith(prefix)]
+        if filter:
+            names = [name for name in names if matches({'name': name}, filter)]
+        return names
+
+    def drop_collection(self, name):
+        self.store.drop(f"{self.name}.{name}")
+
+
+class StorageCursor:
+    def __init__(self, collection, query, projection):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self.spec = []
+        self.skip_count = 0
+        self.limit_count = 0
+
+    def sort(self, key_or_list, direction=None):
+        self.spec = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, count):
+        self.skip_count = count
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def __iter__(self):
+        documents = self.collection._select(self.query, self.spec, self.skip_count, self.limit_count)
+        return iter([project(document, self.projection) for document in documents])
+
+
+class StorageCollection:
+    def __init__(self, store, database_name, name):
+        self.store = store
+        self.name = name
+        self.full_name = f"{database_name}.{name}"
+
+    # Indexes only carry behaviour here: unique constraints and TTL expiry
+    def create_index(self, keys, unique=False, expireAfterSeconds=None, partialFilterExpression=None, **kwargs):
+        fields = tuple(field for field, _ in keys)
+        indexes = self.store.indexes.setdefault(self.full_name, {'unique': {}, 'ttl': {}, 'purged': 0})
+        if unique:
+            indexes['unique'][fields] = partialFilterExpression
+        if expireAfterSeconds is not None:
+            indexes['ttl'][fields[0]] = expireAfterSeconds
+        return '_'.join(fields)
+
+    @contextmanager
+    def _table(self, write=False):
+        with self.store.transaction(self.full_name, write) as table:
+            # Like MongoDB's TTL monitor, expiry is lazy; it runs on writes
+            if write:
+                self._expire(table)
+            yield table
+
+    def _expire(self, table):
+        indexes = self.store.indexes.get(self.full_name)
+        if not indexes or not indexes['ttl'] or time.monotonic() - indexes['purged'] < 1:
+            return
+        indexes['purged'] = time.monotonic()
+        now = datetime.utcnow()
+        for field, seconds in indexes['ttl'].items():
+            table.expire(field, now - timedelta(seconds=seconds))
+
+    def _matching(self, table, query):
+        return ((key, document) for key, document in table.candidates(query) if matches(document, query))
+
+    def _check_unique(self, table, document):
+        indexes = self.store.indexes.get(self.full_name)
+        if not indexes:
+            return
+        for fields, partial in indexes['unique'].items():
+            if partial and not matches(document, partial):
+                continue
+            values = tuple(document.get(field) for field in fields)
+            for key, other in table.candidates(dict(zip(fields, values))):
+                if partial and not matches(other, partial):
+                    continue
+                if other['_id'] != document['_id'] and tuple(other.get(field) for field in fields) == values:
+                    raise DuplicateKeyError(f"Duplicate key for {fields}: {values}")
+
+    def _select(self, query, spec=None, skip=0, limit=0):
+        with self._table() as table:
+            documents = (document for _, document in self._matching(table, query))
+            if spec:
+                documents = sort_documents(list(documents), spec)
+            # Without a sort, a limit stops reading as soon as it is reached
+            return list(itertools.islice(documents, skip, skip + limit if limit else None))
+
+    def _insert(self, table, document):
+        document = copy.deepcopy(document)
+        document.setdefault('_id', ObjectId())
+        if table.get(_key(document['_id'])) is not None:
+            raise DuplicateKeyError(f"Duplicate _id: {document['_id']}")
+        self._check_unique(table, document)
+        table.put(_key(document['_id']), document)
+        return document['_id']
+
+    def insert_one(self, document):
+        with self._table(write=True) as table:
+            inserted_id = self._insert(table, document)
+        document['_id'] = inserted_id
+        return InsertOneResult(inserted_id)
+
+    def insert_many(self, documents, ordered=True):
+        inserted_ids = []
+        errors = []
+        with self._table(write=True) as table:
+            for index, document in enumerate(documents):
+                try:
+                    document['_id'] = self._insert(table, document)
+                    inserted_ids.append(document['_id'])
+                except DuplicateKeyError as e:
+                    errors.append({'index': index, 'code': 11000, 'errmsg': str(e)})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({'writeErrors': errors, 'nInserted': len(inserted_ids)})
+        return InsertManyResult(inserted_ids)
+
+    def find(self, filter=None, projection=None):
+        return StorageCursor(self, filter or {}, projection)
+
+    def find_one(self, filter=None, projection=None):
+        for document in self.find(filter, projection).limit(1):
+            return document
+        return None
+
+    def count_documents(self, filter, limit=0):
+        with self._table() as table:
+            count = sum(1 for _ in self._matching(table, filter))
+        return min(count, limit) if limit else count
+
+    def _update(self, filter, update, upsert, many=False, sort=None):
+        """Apply an update; returns (matched, modified, upserted document, before, after)"""
+        with self._table(write=True) as table:
+            candidates = self._matching(table, filter)
+            if sort:
+                candidates = sort_documents([document for _, document in candidates], _sort_spec(sort))
+                candidates = [(_key(document['_id']), document) for document in candidates]
+            candidates = list(candidates if many else itertools.islice(candidates, 1))
+
+            if not candidates:
+                if not upsert:
+                    return 0, 0, None, None, None
+                document = {field: value for field, value in filter.items()
+                            if not field.startswith('$') and not isinstance(value, dict)}
+                apply_update(document, update, inserting=True)
+                document['_id'] = self._insert(table, document)
+                return 0, 0, document, None, copy.deepcopy(document)
+
+            modified = 0
+            before = after = None
+            for key, document in candidates:
+                before = document
+                updated = copy.deepcopy(document)
+                apply_update(updated, update)
+                self._check_unique(table, updated)
+                if updated != before:
+                    table.put(key, updated)
+                    modified += 1
+                after = copy.deepcopy(updated)
+            return len(candidates), modified, None, before, after
+
+    def update_one(self, filter, update, upsert=False):
+        matched, modified, upserted, _, _ = self._update(filter, update, upsert)
+        return UpdateResult(matched, modified, upserted['_id'] if upserted else None)
+
+    def update_many(self, filter, update, upsert=False):
+        matched, modified, upserted, _, _ = self._update(filter, update, upsert, many=True)
+        return UpdateResult(matched, modified, upserted['_id'] if upserted else None)
+
+    def find_one_and_update(self, filter, update, sort=None, upsert=False,
+                            return_document=ReturnDocument.BEFORE, projection=None):
+        _, _, upserted, before, after = self._update(filter, update, upsert, sort=sort)
+        document = after if return_document == ReturnDocument.AFTER else before
+        return project(document, projection) if document is not None else None
+
+    def _delete(self, filter, many):
+        with self._table(write=True) as table:
+            matching = self._matching(table, filter)
+            keys = [key for key, _ in (matching if many else itertools.islice(matching, 1))]
+            for key in keys:
+                table.delete(key)
+        return len(keys)
+
+    def delete_one(self, filter):
+        return DeleteResult(self._delete(filter, many=False))
+
+    def delete_many(self, filter):
+        return DeleteResult(self._delete(filter, many=True))
+
+    def bulk_write(self, operations, ordered=True):
+        deleted = 0
+        for operation in operations:
+            if isinstance(operation, DeleteMany):
+                deleted += self._delete(operation._filter, many=True)
+            elif isinstance(operation, DeleteOne):
+                deleted += self._delete(operation._filter, many=False)
+            else:
+                raise ValueError(f"Unsupported bulk operation: {type(operation).__name__}")
+        return BulkWriteResult(deleted)
@@ -0,0 +1,158 @@
+from datetime import datetime
+import uuid
+from functools import lru_cache, partial
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.surveys import SURVEYS
+
+NUMERIC_TYPES = ('number', 'slider')
+
+
+def _widget(survey_type, field):
+    """Bind a field's Streamlit widget and arguments once, at compile time"""
+    key = f"{survey_type}_{field['name']}"
+    if field['type'] == 'number':
+        return partial(st.number_input, field['label'], min_value=field['min'],
+                       max_value=field['max'], step=1, key=key)
+    if field['type'] == 'slider':
+        return partial(st.slider, field['label'], field['min'], field['max'], field['default'], key=key)
+    if field['type'] == 'select':
+        return partial(st.selectbox, field['label'], field['options'], key=key)
+    raise ValueError(f"Unknown field type: {field['type']}")
+
+
+def _numeric_column(records, name):
+    values = (record.get(name) for record in records)
+    return np.fromiter((np.nan if value is None else value for value in values),
+                       dtype=np.float64, count=len(records))
+
+
+class CompiledSurvey:
+    """A survey registry entry compiled into its form, validator, decoder and dashboard.
+
+    Compilation happens once per process (see compile_survey), so reruns only
+    call pre-bound widgets instead of rebuilding the form from scratch.
+    """
+
+    def __init__(self, survey_type, spec):
+        self.survey_type = survey_type
+        self.spec = spec
+        self.sections = [
+            (heading, [(field['name'], _widget(survey_type, field)) for field in fields])
+            for heading, fields in spec['sections']
+        ]
+
+        # Fields shared by several sections are asked once; the first wins
+        self.fields = {}
+        for _, fields in spec['sections']:
+            for field in fields:
+                self.fields.setdefault(field['name'], field)
+
+        self.numeric_fields = [name for name, field in self.fields.items() if field['type'] in NUMERIC_TYPES]
+        self.categories = {
+            name: pd.CategoricalDtype(field['options'])
+            for name, field in self.fields.items() if field['type'] == 'select'
+        }
+        self.kpis = spec['kpis']
+
+    def render_form(self, db, session_id):
+        """Render the survey form and store validated submissions.
+
+        An idempotency key is minted per rendered form and only rotated once
+        the submission is stored, so reruns and double clicks re-send the same
+        key and the database drops the duplicate.
+        """
+        key_state = f"{self.survey_type}_{session_id}_submission_key"
+        if key_state not in st.session_state:
+            st.session_state[key_state] = uuid.uuid4().hex
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+
+        with col2:
+            st.markdown("<div class='form-container'>", unsafe_allow_html=True)
+
+            with st.form(f"{self.survey_type}_survey", clear_on_submit=True):
+                response_data = {}
+                asked = set()
+                for number, (heading, widgets) in enumerate(self.sections):
+                    if number:
+                        st.markdown("<div class='form-divider'></div>", unsafe_allow_html=True)
+                    st.subheader(heading)
+                    for name, widget in widgets:
+                        if name not in asked:
+                            asked.add(name)
+                            response_data[name] = widget()
+
+                st.info("🔒 Your responses are encrypted and will be deleted after the session expires")
+                submitted = st.form_submit_button("Submit Survey")
+
+                if submitted:
+                    errors = self.validate(response_data)
+                    if errors:
+                        for error in errors:
+                            st.error(error)
+                    else:
+                        try:
+                            response_data['submitted_at'] = datetime.utcnow().isoformat()
+                            db.store_response(response_data, session_id, st.session_state[key_state])
+                            st.session_state[key_state] = uuid.uuid4().hex
+                            st.success("✨ Thank you for completing the survey!")
+                            st.balloons()
+                        except Exception as e:
+                            st.error(f"Error submitting survey: {str(e)}")
+
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    def validate(self, response):
+        """Check a response against the registry; returns a list of error messages"""
+        errors = []
+        for name, field in self.fields.items():
+            value = response.get(name)
+            if value is None:
+                errors.append(f"Missing answer: {field['label']}")
+            elif field['type'] in NUMERIC_TYPES:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    errors.append(f"{field['label']} must be a number")
+                elif not field['min'] <= value <= field['max']:
+                    errors.append(f"{field['label']} must be between {field['min']} and {field['max']}")
+            elif value not in field['options']:
+                errors.append(f"{field['label']} has an unknown option: {value}")
+
+        unknown = set(response) - set(self.fields) - {'submitted_at'}
+        if unknown:
+            errors.append(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return errors
+
+    def decode(self, records):
+        """Build a typed frame from decrypted responses.
+
+        Numeric answers become float64 columns and categorical answers become
+        pd.Categorical with the registry's options, so no per-row dtype
+        inference happens. Fields missing from older responses decode as NaN.
+        """
+        columns = {name: _numeric_column(records, name) for name in self.numeric_fields}
+        for name, dtype in self.categories.items():
+            columns[name] = pd.Categorical([record.get(name) for record in records], dtype=dtype)
+        return pd.DataFrame(columns)
+
+    def render_dashboard(self, data):
+        """KPI metrics and distributions for one synthetic dataset"""
+        kpis = [kpi for kpi in self.kpis if kpi['column'] in data.columns]
+        if not kpis:
+            st.info("This dataset has none of the survey's key metrics.")
+            return
+
+        metric_cols = st.columns(len(kpis))
+        for col, kpi in zip(metric_cols, kpis):
+            with col:
+                st.metric(kpi['label'], f"{data[kpi['column']].mean():.2f}{kpi['suffix']}")
+                st.bar_chart(data[kpi['column']].round().value_counts().sort_index())
+
+
+@lru_cache(maxsize=None)
+def compile_survey(survey_type):
+    """Compiled survey for `survey_type`, built on first use and reused afterwards"""
+    if survey_type not in SURVEYS:
+        raise ValueError('Invalid survey type')
+    return CompiledSurvey(survey_type, SURVEYS[survey_type])
@@ -0,0 +1,221 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from pymongo.errors import ConnectionFailure
+from utils.database import Database
+from utils.config import MAX_BULK_LINKS, get_survey_config
+from utils.expiry_scheduler import get_expiry_scheduler
+from utils.journal import JournalSink, get_journal, resume_journal
+from utils.session_manager import SessionManager
+from utils.survey_engine import compile_survey
+from utils.synthetic_view import display_synthetic_data
+from utils.admin_view import admin_section, GENERATE_LINK, VIEW_RESPONSES, SYNTHETIC_DATA
+from utils.theme import apply_theme
+
+
+def generate_survey_link(survey_type, session_duration):
+    """Generate a new survey session link"""
+    # Only create a session on an explicit click; reruns reuse the last link
+    state_key = f'{survey_type}_survey_link'
+    if st.button("🔗 Generate Survey Link", key="generate_link"):
+        session_manager = SessionManager(session_duration, survey_type)
+        st.session_state[state_key] = session_manager.generate_session_link()
+
+    if state_key not in st.session_state:
+        st.info("Create a new time-limited survey link to share with respondents.")
+        return None
+
+    link, expiry_time = st.session_state[state_key]
+
+    st.markdown(
+        f"""
+        <div class="survey-section">
+            <h3>🔗 Survey Session Link</h3>
+            <p>Access your personalized survey session by clicking the button below.</p>
+            <a href="{link}" target="_blank" style="text-decoration: none;">
+                <button>Access Survey Session</button>
+            </a>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    # Display countdown timer
+    time_remaining = expiry_time - datetime.utcnow()
+    minutes_remaining = int(time_remaining.total_seconds() / 60)
+
+    st.markdown(
+        f"""
+        <div class="survey-section">
+            <h3>⏱️ Session Expiry Information</h3>
+            <p>Session expires in <strong>{minutes_remaining} minutes</strong>.</p>
+            <p>- This link will be active for {session_duration} minutes.</p>
+            <p>- Multiple responses can be collected during this time.</p>
+            <p>- All responses will be automatically deleted after session expiry.</p>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    if st.button("Copy Link", key="copy_link"):
+        st.code(link)
+        st.success("Link copied to clipboard!")
+
+    return link
+
+
+def generate_bulk_links(survey_type, session_duration):
+    """Generate a batch of survey links for a campaign and offer them as CSV"""
+    state_key = f'{survey_type}_bulk_links'
+    with st.expander("📦 Generate links in bulk"):
+        col1, col2 = st.columns(2)
+        with col1:
+            count = st.number_input("Number of links", min_value=1, max_value=MAX_BULK_LINKS, value=50, step=1)
+        with col2:
+            stagger_minutes = st.number_input(
+                "Spread expiries over (minutes)", min_value=0, max_value=24 * 60, value=0, step=5,
+                help="Staggered expiries keep a campaign from reaching cleanup all at once"
+            )
+
+        if st.button("Generate Links", key="generate_bulk_links"):
+            session_manager = SessionManager(session_duration, survey_type)
+            links = session_manager.generate_session_links(int(count), int(stagger_minutes) * 60)
+            st.session_state[state_key] = pd.DataFrame(links, columns=['link', 'expires_at'])
+
+        if state_key in st.session_state:
+            links = st.session_state[state_key]
+            st.success(f"{len(links)} links ready, expiring {links['expires_at'].min():%H:%M} – {links['expires_at'].max():%H:%M} UTC.")
+            st.download_button(
+                label="💾 Download Links (CSV)",
+                data=links.to_csv(index=False).encode('utf-8'),
+                file_name=f"{survey_type}_links_{datetime.utcnow():%Y%m%d_%H%M%S}.csv",
+                mime="text/csv",
+                key="download_bulk_links"
+            )
+
+
+def display_responses(db):
+    """Display encrypted responses and statistics"""
+    st.markdown("### 📊 Encrypted Survey Responses")
+
+    if st.button("🔄 Refresh Data"):
+        st.rerun()
+
+    stats = db.get_response_stats()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total Active Responses", stats['total_responses'])
+    with col2:
+        st.metric("Last Updated", stats['last_updated'].strftime("%H:%M:%S"))
+
+    st.warning("🔒 For privacy and security, all responses are shown in their encrypted form.")
+
+    try:
+        encrypted_responses = db.get_active_responses()
+
+        if not encrypted_responses:
+            st.info("No active responses found. Responses may have expired or none have been submitted yet.")
+            return
+
+        display_data = []
+        for resp in encrypted_responses:
+            display_data.append({
+                'Response ID': str(resp['_id']),
+                'Encrypted Data': resp['data'],
+                'Created At': resp['created_at'],
+                'Expires At': resp['expires_at']
+            })
+
+        df = pd.DataFrame(display_data)
+
+        st.dataframe(
+            df,
+            column_config={
+                "Created At": st.column_config.DatetimeColumn(format="D MMM, YYYY, HH:mm:ss"),
+                "Expires At": st.column_config.DatetimeColumn(format="D MMM, YYYY, HH:mm:ss"),
+                "Encrypted Data": st.column_config.TextColumn(width="large"),
+            },
+            hide_index=True,
+        )
+
+    except Exception as e:
+        st.error(f"Error displaying encrypted responses: {str(e)}")
+
+
+@st.cache_resource
+def resume_journal_replay():
+    """Replay submissions journaled by an earlier run as soon as the app starts"""
+    return resume_journal()
+
+
+def render_survey_page(survey_type):
+    """Render a complete survey page from its registry entry in utils/surveys.py"""
+    survey = compile_survey(survey_type)
+    session_duration = get_survey_config(survey_type)['SESSION_DURATION_MINUTES']
+
+    st.set_page_config(
+        page_title=survey.spec['page_title'],
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    apply_theme()
+    resume_journal_replay()
+
+    if st.button("← Back to Dashboard"):
+        st.switch_page("/survey_dashboard.py")
+
+    st.markdown(f"<div class='title'>{survey.spec['title']}</div>", unsafe_allow_html=True)
+    st.markdown(f"<div class='subtitle'>{survey.spec['subtitle']}</div>", unsafe_allow_html=True)
+
+    try:
+        db = Database(survey_type)
+        get_expiry_scheduler(survey_type)
+
+        session_id = st.query_params.get("session", None)
+
+        if session_id:
+            # Respondent view
+            session_manager = SessionManager(session_duration, survey_type)
+            if session_manager.validate_session(session_id):
+                survey.render_form(db, session_id)
+            else:
+                st.error("This survey session has expired.")
+                # Check for and display any synthetic data generated
+                synthetic_datasets = db.cleanup_expired_sessions()
+                if synthetic_datasets:
+                    display_synthetic_data(
+                        db,
+                        survey.render_dashboard,
+                        dataset_ids=[dataset['dataset_id'] for dataset in synthetic_datasets]
+                    )
+                st.info("Please request a new survey link from the administrator.")
+        else:
+            # Admin view; only the selected section runs
+            section = admin_section(survey_type)
+
+            if section == GENERATE_LINK:
+                generate_survey_link(survey_type, session_duration)
+                generate_bulk_links(survey_type, session_duration)
+
+            elif section == VIEW_RESPONSES:
+                display_responses(db)
+
+            elif section == SYNTHETIC_DATA:
+                db.cleanup_expired_sessions()
+                status = db.get_cleanup_status()
+                if status and status['pending']:
+                    st.info(f"⏳ {status['pending']} expired sessions are still waiting to be synthesized.")
+                display_synthetic_data(db, survey.render_dashboard)
+
+    except ConnectionFailure as e:
+        session_id = st.query_params.get("session", None)
+        if session_id:
+            # Keep taking answers; the session is checked when the journal is replayed
+            st.warning("The survey database is temporarily unreachable. Your response will be saved securely and stored once it is back.")
+            survey.render_form(JournalSink(survey_type, get_journal()), session_id)
+        else:
+            st.error(f"Database unavailable: {str(e)}")
+
+    except Exception as e:
+        st.error(f"An error occurred: {str(e)}")
@@ -0,0 +1,231 @@
+# Declarative registry of every survey served by the app.
+#
+# Each entry describes a survey's storage, page text, form sections, fields and
+# dashboard KPIs. utils/survey_engine.py compiles entries into form renderers,
+# validators, decoders and dashboards, so adding a survey means adding an entry
+# here plus a two-line page under pages/.
+
+
+def number(name, label, min_value, max_value):
+    return {'name': name, 'label': label, 'type': 'number', 'min': min_value, 'max': max_value}
+
+
+def slider(name, label, min_value, max_value, default):
+    return {'name': name, 'label': label, 'type': 'slider', 'min': min_value, 'max': max_value,
+            'default': default}
+
+
+def select(name, label, options):
+    return {'name': name, 'label': label, 'type': 'select', 'options': options}
+
+
+def kpi(column, label, suffix=''):
+    return {'column': column, 'label': label, 'suffix': suffix}
+
+
+FREQUENCY = ["Never", "Occasionally", "Regularly"]
+YES_NO = ["Yes", "No"]
+
+# Field groups shared by several surveys
+AGE_GENDER = [
+    number('age', "Age:", 16, 100),
+    select('gender', "Gender:", ["Male", "Female", "Non-binary", "Other", "Prefer not to say"])
+]
+ACADEMIC_YEAR = [
+    select('academic_year', "Academic Year:", ["Freshman", "Sophomore", "Junior", "Senior", "Graduate"])
+]
+LIVING_EMPLOYMENT = [
+    select('living_situation', "Living Situation:", ["On-campus", "Off-campus"]),
+    select('employment_status', "Employment Status:", ["Unemployed", "Part-time", "Full-time"])
+]
+DEMOGRAPHICS = AGE_GENDER + ACADEMIC_YEAR + LIVING_EMPLOYMENT
+
+ACADEMIC_MENTAL_HEALTH = [
+    select('academic_dishonesty', "Experiences with academic dishonesty:", ["None", "Minor", "Severe"]),
+    slider('perceived_pressure', "Perceived pressure to perform well (1-5):", 1, 5, 3),
+    slider('workload_stress', "Workload stress (1-5):", 1, 5, 3),
+    number('depression_score', "Depression score (PHQ-9 items):", 0, 27),
+    number('anxiety_score', "Anxiety score (GAD-7 items):", 0, 21)
+]
+WELLBEING_HABITS = [
+    select('exercise_frequency', "Exercise Frequency:", ["Never", "Rarely", "Regularly"]),
+    select('meditation', "Meditation/Mindfulness Practice:", ["Never", "Occasionally", "Regularly"]),
+    select('social_activities', "Social Activities Level:", ["Low", "Moderate", "High"])
+]
+LIFESTYLE = [
+    number('study_hours', "Study Hours per Week:", 0, 100),
+    slider('academic_pressure', "Academic pressure (1-5):", 1, 5, 3)
+] + WELLBEING_HABITS
+SUPPORT_RESOURCES = [
+    select('professional_help', "Professional Help Utilization:", FREQUENCY),
+    select('access_counseling', "Access to Counseling:", ["Yes", "No", "Unsure"]),
+    slider('support_network', "Support Network Rating (1-10):", 1, 10, 5),
+    select('campus_resources', "Knowledge of Campus Resources:", ["Poor", "Moderate", "Good", "Excellent"]),
+    select('barriers_help', "Barriers to Seeking Help:", ["None", "Cost", "Availability", "Other"])
+]
+SEXUAL_HEALTH = [
+    select('sexually_active', "Are you sexually active?", YES_NO),
+    select('contraception_use', "Contraception Use:", ["Always", "Sometimes", "Never", "Not Applicable"]),
+    slider('sti_awareness', "STI Awareness Level (1-10):", 1, 10, 5),
+    select('experienced_harassment', "Have you experienced harassment?", YES_NO),
+    select('experienced_assault', "Have you experienced assault?", YES_NO),
+    slider('consent_education', "Consent Education Level (1-10):", 1, 10, 5),
+    slider('support_resources_knowledge', "Support Resources Knowledge (1-10):", 1, 10, 5)
+]
+FINANCIAL_HARDSHIP = [
+    select('access_financial_aid', "Do you have access to financial aid?", YES_NO),
+    select('receiving_scholarships', "Are you receiving scholarships?", YES_NO),
+    select('food_insecurity', "How often do you experience food insecurity?", ["Never", "Sometimes", "Often"]),
+    select('housing_instability', "Housing Stability:", ["Stable", "Unstable"]),
+    slider('financial_stress', "Financial Stress Level (1-10):", 1, 10, 5),
+    slider('impact_academic', "Impact of Financial Hardship on Academic Success (1-10):", 1, 10, 5)
+]
+
+SURVEYS = {
+    'mental_health': {
+        'category': "Mental Health & Well-being",
+        'description': "Gain valuable insights into community mental health trends and support needs through anonymous feedback",
+        'page_title': "Mental Health - VeraCrypt",
+        'title': "Student Wellness Survey",
+        'subtitle': "Share your experiences anonymously and securely",
+        'database_name': 'mental_health_survey_db',
+        'base_url_env': 'MENTAL_HEALTH_BASE_URL',
+        'sections': [
+            ("Demographics", DEMOGRAPHICS),
+            ("Academic & Mental Health Factors", ACADEMIC_MENTAL_HEALTH),
+            ("Lifestyle Factors", LIFESTYLE),
+            ("Mental Health Support & Resources", SUPPORT_RESOURCES)
+        ],
+        'kpis': [
+            kpi('depression_score', "Average Depression Score", "/27"),
+            kpi('anxiety_score', "Average Anxiety Score", "/21"),
+            kpi('support_network', "Support Network Rating", "/10")
+        ]
+    },
+    'academic_integrity': {
+        'category': "Academic Integrity & Performance",
+        'description': "Evaluate academic honesty practices and identify areas for improving educational outcomes",
+        'page_title': "Academic Integrity - VeraCrypt",
+        'title': "Academic Integrity Survey",
+        'subtitle': "Help us understand and improve academic integrity in our community",
+        'database_name': 'academic_integrity_survey_db',
+        'base_url_env': 'ACADEMIC_INTEGRITY_BASE_URL',
+        'sections': [
+            ("Demographics", DEMOGRAPHICS),
+            ("Mental Health Support & Resources", SUPPORT_RESOURCES),
+            ("Financial Hardship Factors", FINANCIAL_HARDSHIP),
+            ("Academic Integrity Factors", [
+                select('experienced_dishonesty', "Have you experienced academic dishonesty?", YES_NO),
+                select('type_of_dishonesty', "Type of Dishonesty:", ["None", "Plagiarism", "Cheating", "Other"]),
+                slider('academic_integrity_pressure', "Perceived Pressure (1-10):", 1, 10, 5),
+                number('study_hours_integrity', "Study Hours Per Week:", 0, 100),
+                slider('workload_stress_integrity', "Workload Stress Level (1-10):", 1, 10, 5)
+            ])
+        ],
+        'kpis': [
+            kpi('academic_integrity_pressure', "Perceived Pressure", "/10"),
+            kpi('workload_stress_integrity', "Workload Stress", "/10"),
+            kpi('study_hours_integrity', "Study Hours per Week")
+        ]
+    },
+    'socioeconomic_status': {
+        'category': "Socioeconomic Status & Financial Hardship",
+        'description': "Understand economic challenges and develop targeted support strategies for your community",
+        'page_title': "Socioeconomic Status - VeraCrypt",
+        'title': "Socioeconomic Status Survey",
+        'subtitle': "Help us understand economic challenges and develop effective support strategies",
+        'database_name': 'socio_economic_survey_db',
+        'base_url_env': 'SOCIOECONOMIC_STATUS_BASE_URL',
+        'sections': [
+            ("Demographics", DEMOGRAPHICS),
+            ("Financial Hardship Factors", FINANCIAL_HARDSHIP)
+        ],
+        'kpis': [
+            kpi('financial_stress', "Average Financial Stress", "/10"),
+            kpi('impact_academic', "Impact on Academic Success", "/10"),
+            kpi('age', "Average Age")
+        ]
+    },
+    'diversity_equality': {
+        'category': "Diversity, Equality & Inclusion",
+        'description': "Assess inclusivity initiatives and gather insights to create a more equitable environment",
+        'page_title': "Diversity & Equality - VeraCrypt",
+        'title': "Diversity & Equality Survey",
+        'subtitle': "Help us create a more inclusive and equitable environment",
+        'database_name': 'diversity_equality_survey_db',
+        'base_url_env': 'DIVERSITY_EQUALITY_BASE_URL',
+        'sections': [
+            ("Demographics", DEMOGRAPHICS),
+            ("Academic & Mental Health Factors", ACADEMIC_MENTAL_HEALTH),
+            ("Lifestyle Factors", LIFESTYLE),
+            ("Mental Health Support & Resources", SUPPORT_RESOURCES),
+            ("Sexual Health Factors", SEXUAL_HEALTH),
+            ("Financial Hardship Factors", FINANCIAL_HARDSHIP),
+            ("DEI Factors", [
+                select('experienced_discrimination', "Have you experienced discrimination?", YES_NO),
+                select('type_of_discrimination', "Type of Discrimination:",
+                       ["None", "Gender-based", "LGBTQ+", "Disability-related", "Other"]),
+                select('microaggressions_faced', "How often have you faced microaggressions?",
+                       ["Never", "Rarely", "Sometimes", "Often"]),
+                slider('campus_climate', "Campus Climate Rating (1-10):", 1, 10, 5),
+                slider('sense_of_belonging', "Sense of Belonging (1-10):", 1, 10, 5)
+            ])
+        ],
+        'kpis': [
+            kpi('campus_climate', "Campus Climate Rating", "/10"),
+            kpi('sense_of_belonging', "Sense of Belonging", "/10"),
+            kpi('support_network', "Support Network Rating", "/10")
+        ]
+    },
+    'sexual_health': {
+        'category': "Sexual Health & Awareness",
+        'description': "Promote comprehensive sexual health education and awareness through confidential feedback",
+        'page_title': "Sexual Health - VeraCrypt",
+        'title': "Sexual Health Survey",
+        'subtitle': "Share your experiences anonymously and securely",
+        'database_name': 'sexual_health_survey_db',
+        'base_url_env': 'SEXUAL_HEALTH_BASE_URL',
+        'sections': [
+            ("Demographics", AGE_GENDER + LIVING_EMPLOYMENT),
+            ("Mental Health Factors", [
+                slider('perceived_pressure', "Perceived pressure (1-5):", 1, 5, 3),
+                number('depression_score', "Depression score (PHQ-9 items):", 0, 27),
+                number('anxiety_score', "Anxiety score (GAD-7 items):", 0, 21)
+            ]),
+            ("Lifestyle Factors", WELLBEING_HABITS),
+            ("Mental Health Support & Resources", SUPPORT_RESOURCES),
+            ("Sexual Health Factors", SEXUAL_HEALTH)
+        ],
+        'kpis': [
+            kpi('sti_awareness', "STI Awareness", "/10"),
+            kpi('consent_education', "Consent Education", "/10"),
+            kpi('support_resources_knowledge', "Support Resources Knowledge", "/10")
+        ]
+    },
+    'substance_use': {
+        'category': "Substance Use & Risk Behavior",
+        'description': "Address substance use patterns and develop effective prevention strategies",
+        'page_title': "Substance Use Survey - VeraCrypt",
+        'title': "Substance Use & Risk Behavior Survey",
+        'subtitle': "Help us understand patterns and develop effective prevention strategies",
+        'database_name': 'substance_use_survey_db',
+        'base_url_env': 'SUBSTANCE_USE_BASE_URL',
+        'sections': [
+            ("Substance Use Patterns", [
+                select('alcohol_use', "How often do you consume alcohol?", ["Never", "Rarely", "Sometimes", "Often"]),
+                select('tobacco_use', "How often do you use tobacco?", ["Never", "Rarely", "Sometimes", "Often"]),
+                select('drug_use', "How often do you use drugs?", ["Never", "Rarely", "Sometimes", "Often"])
+            ]),
+            ("Rating Scales", [
+                slider('peer_pressure', "Rate the level of peer pressure you experience (1-10):", 1, 10, 5),
+                slider('academic_performance', "Rate your academic performance (1-10):", 1, 10, 5),
+                slider('well_being', "Rate your overall well-being (1-10):", 1, 10, 5)
+            ])
+        ],
+        'kpis': [
+            kpi('peer_pressure', "Average Peer Pressure", "/10"),
+            kpi('academic_performance', "Academic Performance", "/10"),
+            kpi('well_being', "Overall Well-being", "/10")
+        ]
+    }
+}
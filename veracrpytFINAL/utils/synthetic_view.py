@@ -0,0 +1,132 @@
+import math
+import streamlit as st
+from utils.config import SYNTHETIC_PAGE_SIZE
+from utils.exports import EXPORT_FORMATS, export_filename
+
+# Synthetic values carry ~17 significant digits of sampling noise; offer rounding
+DOWNLOAD_PRECISIONS = [3, 2, 4, 6, None]
+
+# Everything derived from a dataset is computed on demand and cached by
+# (survey_type, dataset_id), so collapsed or unopened datasets cost nothing
+# beyond their catalog metadata.
+
+
+@st.cache_data(max_entries=32, show_spinner="Loading synthetic dataset...")
+def load_dataset(_db, survey_type, dataset_id):
+    return _db.load_synthetic_dataset(dataset_id)
+
+
+@st.cache_data(max_entries=32, show_spinner="Preparing download...")
+def export_bytes(_db, survey_type, dataset_id, fmt, precision):
+    return _db.export_synthetic_dataset(dataset_id, fmt, precision)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def correlation_matrix(_db, survey_type, dataset_id):
+    data = load_dataset(_db, survey_type, dataset_id)
+    numeric_cols = data.select_dtypes(include='number').columns
+    return data[numeric_cols].corr()
+
+
+def _display_dataset(db, entry, visualize):
+    dataset_id = str(entry['_id'])
+    survey_type = db.survey_type
+
+    label = f"Synthetic Dataset from {entry['created_at'].strftime('%d %b %Y, %H:%M')} ({entry['row_count']} rows)"
+    with st.expander(label):
+        view = st.radio(
+            "View",
+            ["Summary", "Dataset Preview", "Visualizations", "Correlation Analysis"] if visualize
+            else ["Summary", "Dataset Preview", "Correlation Analysis"],
+            horizontal=True,
+            key=f"view_{dataset_id}",
+            label_visibility="collapsed"
+        )
+
+        if view == "Summary":
+            st.write(f"**Columns:** {', '.join(entry['columns'])}")
+            timings = entry.get('timings', {})
+            if timings:
+                st.caption(
+                    f"Built from {timings.get('source_responses', '?')} responses in "
+                    f"{timings.get('decrypt_seconds', 0) + timings.get('synthesis_seconds', 0):.2f}s"
+                )
+
+        elif view == "Dataset Preview":
+            data = load_dataset(db, survey_type, dataset_id)
+            st.markdown("**Preview of Synthetic Data**")
+            st.dataframe(data.head())
+
+            col1, col2 = st.columns(2)
+            with col1:
+                fmt = st.selectbox(
+                    "Format",
+                    list(EXPORT_FORMATS),
+                    format_func=lambda key: EXPORT_FORMATS[key]['label'],
+                    key=f"format_{dataset_id}"
+                )
+            with col2:
+                precision = st.selectbox(
+                    "Decimal places",
+                    DOWNLOAD_PRECISIONS,
+                    format_func=lambda value: "Full precision" if value is None else str(value),
+                    key=f"precision_{dataset_id}"
+                )
+
+            if st.toggle("Prepare download", key=f"prepare_{dataset_id}"):
+                st.download_button(
+                    label=f"💾 Download Complete Synthetic Dataset ({EXPORT_FORMATS[fmt]['label']})",
+                    data=export_bytes(db, survey_type, dataset_id, fmt, precision),
+                    file_name=export_filename(entry['filename'], fmt),
+                    mime=EXPORT_FORMATS[fmt]['mime'],
+                    key=f"download_{dataset_id}"
+                )
+
+        elif view == "Visualizations":
+            st.markdown("**📈 Key Insights**")
+            visualize(load_dataset(db, survey_type, dataset_id))
+
+        else:
+            st.markdown("**📊 Correlation Analysis**")
+            metadata = db.get_synthetic_dataset(dataset_id)
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.markdown("**Original Data Significant Correlations**")
+                for pair, corr in metadata['original_correlations'].items():
+                    st.write(f"{pair}: {corr:.3f}")
+
+            with col2:
+                st.markdown("**Synthetic Data Significant Correlations**")
+                for pair, corr in metadata['synthetic_correlations'].items():
+                    st.write(f"{pair}: {corr:.3f}")
+
+            if st.toggle("Show full correlation matrix", key=f"matrix_{dataset_id}"):
+                corr = correlation_matrix(db, survey_type, dataset_id)
+                st.dataframe(corr.style.background_gradient(cmap='RdYlBu'))
+
+
+def display_synthetic_data(db, visualize=None, dataset_ids=None):
+    """Paginated catalog of synthetic datasets with lazily rendered details.
+
+    `visualize` is an optional page-specific callback that draws insights for
+    one dataset. `dataset_ids` restricts the view to specific datasets (e.g.
+    the ones the current cleanup just produced) instead of the whole catalog.
+    """
+    if dataset_ids is not None:
+        entries = [db.get_synthetic_dataset(dataset_id) for dataset_id in dataset_ids]
+    else:
+        total = db.count_synthetic_datasets()
+        if not total:
+            st.info("No synthetic data available yet. It will appear here when sessions expire.")
+            return
+
+        pages = math.ceil(total / SYNTHETIC_PAGE_SIZE)
+        st.markdown(f"### 📊 Synthetic Data Generated ({total} datasets)")
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"synthetic_page_{db.survey_type}")
+        entries = db.list_synthetic_datasets(limit=SYNTHETIC_PAGE_SIZE, skip=(page - 1) * SYNTHETIC_PAGE_SIZE)
+
+    for entry in entries:
+        if entry:
+            _display_dataset(db, entry, visualize)
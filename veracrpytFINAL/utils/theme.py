@@ -0,0 +1,145 @@
+import streamlit as st
+
+# Theme colors shared by the survey pages
+THEME_COLORS = {
+    'light': {
+        'bg': 'linear-gradient(135deg, rgba(242,240,233,0.95), rgba(242,240,233,0.85))',
+        'text': '#2C3E50',
+        'card_bg': 'rgba(255, 255, 255, 0.9)',
+        'card_shadow': '0 4px 6px rgba(0,0,0,0.08)',
+        'gradient': 'linear-gradient(120deg, #34495E, #2C3E50)',
+        'subtitle': '#516170',
+        'stat_number': '#34495E',
+        'stat_label': '#516170',
+        'card_border': 'rgba(44, 62, 80, 0.1)',
+        'success': '#2ecc71',
+        'warning': '#f39c12',
+        'error': '#e74c3c',
+        'info': '#3498db'
+    },
+    'dark': {
+        'bg': '#1a1a1a',
+        'text': '#ffffff',
+        'card_bg': '#2d2d2d',
+        'card_shadow': '0 4px 6px rgba(0,0,0,0.3)',
+        'gradient': 'linear-gradient(120deg, #64B5F6, #1E88E5)',
+        'subtitle': '#a0a0a0',
+        'stat_number': '#64B5F6',
+        'stat_label': '#a0a0a0',
+        'card_border': '#404040',
+        'success': '#27ae60',
+        'warning': '#f1c40f',
+        'error': '#c0392b',
+        'info': '#2980b9'
+    }
+}
+
+
+# Enhanced CSS with theme support
+def get_css(theme_colors):
+    return f"""
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700&display=swap');
+
+    body {{
+        font-family: 'Poppins', sans-serif;
+        background: {theme_colors['bg']};
+        color: {theme_colors['text']};
+        min-height: 100vh;
+    }}
+    
+    .stApp {{
+        background: {theme_colors['bg']};
+    }}
+
+    .title {{
+        font-size: 2.5rem;
+        font-weight: bold;
+        background: {theme_colors['gradient']};
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        margin-bottom: 1rem;
+    }}
+    
+    .subtitle {{
+        font-size: 1.2rem;
+        color: {theme_colors['subtitle']};
+        margin-bottom: 2rem;
+    }}
+    
+    .form-container {{
+        background: {theme_colors['card_bg']};
+        padding: 2rem;
+        border-radius: 10px;
+        box-shadow: {theme_colors['card_shadow']};
+        border: 1px solid {theme_colors['card_border']};
+        margin-bottom: 1.5rem;
+    }}
+    
+    .stButton button {{
+        background: {theme_colors['gradient']};
+        color: white;
+        border: none;
+        padding: 0.5rem 1rem;
+        border-radius: 5px;
+        font-weight: 600;
+        transition: opacity 0.2s;
+    }}
+    
+    .stButton button:hover {{
+        opacity: 0.9;
+    }}
+
+    /* Survey specific styles */
+    .survey-section {{
+        background: {theme_colors['card_bg']};  /* Added this for consistency */
+        padding: 1.5rem;
+        border-radius: 10px;
+        margin-bottom: 1rem;
+        border: 1px solid {theme_colors['card_border']};
+    }}
+    
+    .survey-section h3 {{
+        color: {theme_colors['text']};
+        margin-bottom: 0.5rem;
+    }}
+    
+    .survey-section p {{
+        color: {theme_colors['subtitle']};
+        margin-bottom: 0.5rem;
+    }}
+    
+    .survey-section button {{
+        background: {theme_colors['info']};
+        color: white;
+        padding: 0.5rem 1rem;
+        border: none;
+        border-radius: 5px;
+        font-weight: bold;
+        cursor: pointer;
+    }}
+    
+    .survey-section button:hover {{
+        background: {theme_colors['success']};
+    }}
+    
+    </style>
+    """
+
+
+def toggle_theme():
+    st.session_state.theme = 'dark' if st.session_state.theme == 'light' else 'light'
+
+
+def apply_theme():
+    """Inject the current theme's CSS and draw the sidebar theme toggle"""
+    if 'theme' not in st.session_state:
+        st.session_state.theme = 'light'
+
+    st.markdown(get_css(THEME_COLORS[st.session_state.theme]), unsafe_allow_html=True)
+
+    with st.sidebar:
+        st.image("logo.png")
+        if st.button("🌓 Toggle Theme", key="theme_toggle"):
+            toggle_theme()
+            st.rerun()